@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Cyber Nexus - Benchmarks dos caminhos críticos
+Mede geração, verificação, contagem de caminhos, reset e um frame completo
+desenhado fora da tela, em vários tamanhos de grafo com sementes fixas.
+
+Uso:
+    python bench.py --output atual.json
+    python bench.py --compare base.json --threshold 0.25
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from graph_core import (analyze_paths, check_bfs_path, check_dfs_path,
+                        find_bfs_path, generate_random_graph, graph_bounds)
+
+DEFAULT_SIZES = [12, 100, 1000, 10000]
+DEFAULT_SEED = 1234
+DEFAULT_THRESHOLD = 0.25
+# Tempo mínimo de medição por caso (s) e limites de repetições
+MIN_BENCH_TIME = 0.5
+MIN_REPEATS = 5
+MAX_REPEATS = 200
+
+def make_graph(num_nodes, seed):
+    return generate_random_graph(num_nodes, *graph_bounds(num_nodes), seed=seed)
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, int(math.ceil(fraction * len(ordered))) - 1))
+    return ordered[k]
+
+def measure(func, repeats=None):
+    """Executa func repetidamente; retorna (amostras em s, pico de memória em bytes)"""
+    # Aquecimento + pico de memória numa execução separada
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples = []
+    started = time.perf_counter()
+    while True:
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+        if repeats is not None:
+            if len(samples) >= repeats:
+                break
+        elif len(samples) >= MAX_REPEATS or (
+                len(samples) >= MIN_REPEATS and time.perf_counter() - started > MIN_BENCH_TIME):
+            break
+    return samples, peak
+
+def bench_cases(num_nodes, seed, game=None):
+    """Casos de benchmark para um tamanho: lista de (nome, função)"""
+    graph = make_graph(num_nodes, seed)
+    bfs_path = find_bfs_path(graph)
+
+    cases = [
+        ("generate_random_graph", lambda: make_graph(num_nodes, seed)),
+        ("verify_bfs", lambda: check_bfs_path(graph, bfs_path)),
+        ("verify_dfs", lambda: check_dfs_path(graph, bfs_path)),
+        ("show_available_paths", lambda: analyze_paths(graph)),
+        ("graph_reset", graph.reset),
+    ]
+
+    if game is not None:
+        def draw_frame():
+            game.draw()
+
+        def prepare_frame():
+            game.graph = graph
+            game.player_path = []
+            game.draw()  # constrói as camadas em cache
+        cases.append(("draw_frame", draw_frame, prepare_frame))
+    return cases
+
+def make_game(scaled=False):
+    """CyberNexus fora da tela (driver SDL dummy)"""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    from main import CyberNexus, GameState
+    game = CyberNexus(scaled=scaled)
+    game.change_state(GameState.PHASE_1_PLAY)
+    return game
+
+def run_benchmarks(sizes, seed, repeats=None, draw=True, scaled=False):
+    game = make_game(scaled) if draw else None
+    results = {}
+    for num_nodes in sizes:
+        for case in bench_cases(num_nodes, seed, game):
+            name, func = case[0], case[1]
+            if len(case) > 2:
+                case[2]()
+            samples, peak = measure(func, repeats)
+            key = f"{name}[{num_nodes}]"
+            results[key] = {
+                "median_ms": statistics.median(samples) * 1000,
+                "p99_ms": percentile(samples, 0.99) * 1000,
+                "peak_kb": peak / 1024,
+                "runs": len(samples),
+            }
+            print(f"{key:32s} mediana {results[key]['median_ms']:10.3f} ms  "
+                  f"p99 {results[key]['p99_ms']:10.3f} ms  "
+                  f"pico {results[key]['peak_kb']:10.1f} KiB  ({len(samples)} execuções)")
+    return results
+
+def compare(results, baseline, threshold):
+    """Lista as regressões de mediana acima do limite relativo"""
+    regressions = []
+    for key, current in results.items():
+        old = baseline.get(key)
+        if old is None or old["median_ms"] <= 0:
+            continue
+        ratio = current["median_ms"] / old["median_ms"]
+        if ratio > 1 + threshold:
+            regressions.append((key, old["median_ms"], current["median_ms"], ratio))
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do Cyber Nexus")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="números de nós a medir")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeats", type=int, default=None,
+                        help="repetições fixas por caso (padrão: adaptativo)")
+    parser.add_argument("--no-draw", action="store_true",
+                        help="não mede o frame desenhado (dispensa pygame)")
+    parser.add_argument("--scaled", action="store_true",
+                        help="janela pygame.SCALED no frame desenhado")
+    parser.add_argument("--output", help="salva os resultados em JSON")
+    parser.add_argument("--compare", help="JSON de referência para detectar regressões")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="regressão relativa tolerada na mediana (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmarks(args.sizes, args.seed, args.repeats, draw=not args.no_draw,
+                             scaled=args.scaled)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"seed": args.seed, "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for key, old, new, ratio in regressions:
+            print(f"REGRESSÃO {key}: {old:.3f} ms -> {new:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print("Nenhuma regressão acima do limite.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
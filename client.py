@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Cyber Nexus - Cliente leve do servidor de sala de aula
+Fala o protocolo de linhas JSON do server.py. Cada "aluno" entra, joga as
+fases pedidas clicando num caminho correto e verifica; com --students N
+simula N alunos ao mesmo tempo e mede a latência de cada operação.
+
+Uso:
+    python server.py --port 8765
+    python client.py --port 8765 --students 30 --rounds 5
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from graph_core import Graph, Node, find_bfs_path, find_weighted_path
+from server import DEFAULT_HOST, DEFAULT_PORT, MAX_REQUEST_BYTES, PHASES
+
+DEFAULT_STUDENTS = 1
+DEFAULT_ROUNDS = 1
+
+class RequestError(Exception):
+    pass
+
+class NexusClient:
+    """Conexão com o servidor; request() envia uma operação e espera a resposta"""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        # Respostas com o grafo podem passar do limite padrão de linha
+        reader, writer = await asyncio.open_connection(host, port, limit=16 * MAX_REQUEST_BYTES)
+        return cls(reader, writer)
+
+    async def request(self, op, **params):
+        self.next_id += 1
+        message = {"id": self.next_id, "op": op, **params}
+        self.writer.write(json.dumps(message).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise RequestError("conexão encerrada pelo servidor")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise RequestError(response.get("error", "erro desconhecido"))
+        return response
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+def graph_from_description(data):
+    """Reconstrói o grafo enviado pelo servidor (describe_graph)"""
+    graph = Graph()
+    nodes = {}
+    for node_id, x, y in data["nodes"]:
+        node = Node(node_id, x, y, is_target=(node_id == data["target"]))
+        nodes[node_id] = node
+        graph.add_node(node)
+    for a, b, weight in data["edges"]:
+        graph.add_edge(nodes[a], nodes[b], weight)
+    graph.weighted = data["weighted"]
+    graph.start_node = nodes[data["start"]]
+    return graph
+
+def solve(graph):
+    """Um caminho aceito em qualquer fase: mínimo em custo ou em arestas"""
+    return find_weighted_path(graph) if graph.weighted else find_bfs_path(graph)
+
+async def timed(latencies, client, op, **params):
+    started = time.perf_counter()
+    response = await client.request(op, **params)
+    latencies.setdefault(op, []).append((time.perf_counter() - started) * 1000)
+    return response
+
+async def play_student(host, port, name, phases, rounds, latencies):
+    """Joga `rounds` grafos de cada fase; retorna quantas verificações deram certo"""
+    client = await NexusClient.connect(host, port)
+    successes = 0
+    try:
+        await timed(latencies, client, "join", name=name)
+        for phase in phases:
+            response = await timed(latencies, client, "start", phase=phase)
+            for round_number in range(rounds):
+                if round_number > 0:
+                    response = await timed(latencies, client, "new_graph")
+                graph = graph_from_description(response["graph"])
+                for node in solve(graph):
+                    await timed(latencies, client, "click", node=node.id)
+                verdict = await timed(latencies, client, "verify")
+                if verdict["status"] == "SUCCESS":
+                    successes += 1
+        await timed(latencies, client, "bye")
+    finally:
+        await client.close()
+    return successes
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+async def run_students(host, port, students, phases, rounds):
+    latencies = {}
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        play_student(host, port, f"aluno{k + 1}", phases, rounds, latencies)
+        for k in range(students)])
+    elapsed = time.perf_counter() - started
+    expected = students * len(phases) * rounds
+    print(f"{students} alunos, {sum(results)}/{expected} verificações corretas em {elapsed:.2f} s")
+    for op, samples in latencies.items():
+        print(f"{op:10s} {len(samples):6d}×  p50 {percentile(samples, 0.5):8.2f}  "
+              f"p95 {percentile(samples, 0.95):8.2f}  p99 {percentile(samples, 0.99):8.2f} ms")
+    return sum(results) == expected
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cliente de teste do servidor Cyber Nexus")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--students", type=int, default=DEFAULT_STUDENTS,
+                        help="alunos simulados ao mesmo tempo")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS,
+                        help="grafos jogados por fase")
+    parser.add_argument("--phases", type=int, nargs="+", default=list(PHASES),
+                        choices=list(PHASES))
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        ok = asyncio.run(run_students(args.host, args.port, args.students,
+                                      args.phases, args.rounds))
+    except (OSError, RequestError) as exc:
+        print(f"Erro: {exc}")
+        return 1
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Cyber Nexus - Gerador de bancos de puzzles com filtros de dificuldade
+Gera grafos aleatórios em paralelo (um processo por núcleo), mede cada um
+e grava no banco só os que passam nos filtros. Cada candidato usa a
+semente base + seu número, então o resultado não depende do número de
+processos.
+
+Uso:
+    python generate_bank.py puzzles.cnxb --count 1000 --min-paths 20 --max-crossings 2
+    python main.py --bank puzzles.cnxb
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque, namedtuple
+from multiprocessing import Pool
+
+from graph_core import (analyze_paths, average_degree, count_edge_crossings,
+                        generate_random_graph, graph_bounds)
+from puzzle_bank import BankWriter, graph_to_bytes
+
+DEFAULT_COUNT = 1000
+DEFAULT_SEED = 1
+DEFAULT_NODES = 12
+# Candidatos por tarefa enviada a um processo
+BLOCK_SIZE = 64
+# Tarefas em andamento por processo
+BLOCKS_IN_FLIGHT = 4
+# Orçamento (passos, não tempo) para contar caminhos simples de cada
+# candidato: o banco sai igual a partir da semente em qualquer máquina
+SCORE_PATH_MAX_STEPS = 300000
+
+PuzzleScore = namedtuple("PuzzleScore", "simple_paths exact bfs_depth avg_degree crossings")
+Filters = namedtuple("Filters", "min_paths max_paths min_depth max_depth "
+                                "min_degree max_degree max_crossings")
+
+def score_graph(graph):
+    stats = analyze_paths(graph, None, SCORE_PATH_MAX_STEPS)
+    return PuzzleScore(stats.simple_paths, stats.exact, stats.shortest_length,
+                       average_degree(graph), count_edge_crossings(graph))
+
+def accepts(score, filters):
+    """O puzzle está dentro de todos os limites pedidos (None = sem limite)?"""
+    if score.bfs_depth is None:
+        return False
+    checks = [
+        (filters.min_paths, score.simple_paths, 1),
+        (filters.max_paths, score.simple_paths, -1),
+        (filters.min_depth, score.bfs_depth, 1),
+        (filters.max_depth, score.bfs_depth, -1),
+        (filters.min_degree, score.avg_degree, 1),
+        (filters.max_degree, score.avg_degree, -1),
+        (filters.max_crossings, score.crossings, -1),
+    ]
+    for limit, value, sign in checks:
+        if limit is not None and (value - limit) * sign < 0:
+            return False
+    # Contagem só aproximada ("≥ N") não garante um máximo
+    if filters.max_paths is not None and not score.exact:
+        return False
+    return True
+
+def generate_block(task):
+    """Gera e filtra os candidatos [first, first + size); roda num processo do pool"""
+    first, size, num_nodes, filters = task
+    accepted = []
+    for seed in range(first, first + size):
+        graph = generate_random_graph(num_nodes, *graph_bounds(num_nodes), seed=seed)
+        score = score_graph(graph)
+        if accepts(score, filters):
+            accepted.append((seed, score, graph_to_bytes(graph)))
+    return accepted
+
+def generate_bank(path, count, filters, num_nodes=DEFAULT_NODES, seed=DEFAULT_SEED,
+                  workers=None, max_candidates=None, block_size=BLOCK_SIZE):
+    """Preenche o banco com até `count` puzzles aceitos; retorna (aceitos, candidatos, segundos)"""
+    workers = workers or os.cpu_count() or 1
+    if max_candidates is None:
+        max_candidates = count * 1000
+    accepted = 0
+    next_first = seed
+    examined = 0
+    last = seed + max_candidates
+    started = time.perf_counter()
+
+    with BankWriter(path) as writer, Pool(workers) as pool:
+        # Blocos em ordem de semente; só se enviam novos enquanto faltam
+        # puzzles, e os que sobrarem em andamento são descartados no fim
+        pending = deque()
+        while accepted < count:
+            while len(pending) < workers * BLOCKS_IN_FLIGHT and next_first < last:
+                size = min(block_size, last - next_first)
+                pending.append((size, pool.apply_async(
+                    generate_block, ((next_first, size, num_nodes, filters),))))
+                next_first += size
+            if not pending:
+                break
+            size, result = pending.popleft()
+            for _, _, record in result.get():
+                if accepted < count:
+                    writer.add_bytes(record)
+                    accepted += 1
+            examined += size
+            if examined % (block_size * workers * BLOCKS_IN_FLIGHT) == 0 or accepted >= count:
+                elapsed = time.perf_counter() - started
+                print(f"{accepted}/{count} aceitos de {examined} candidatos "
+                      f"({examined / elapsed:.0f} grafos/s)")
+    return accepted, examined, time.perf_counter() - started
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um banco de puzzles do Cyber Nexus")
+    parser.add_argument("output", help="arquivo do banco (.cnxb)")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT,
+                        help="puzzles aceitos desejados")
+    parser.add_argument("--nodes", type=int, default=DEFAULT_NODES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED,
+                        help="semente do primeiro candidato")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processos (padrão: todos os núcleos)")
+    parser.add_argument("--max-candidates", type=int, default=None,
+                        help="desiste após N candidatos (padrão: 1000 × count)")
+    parser.add_argument("--min-paths", type=int, default=None, help="mínimo de caminhos simples")
+    parser.add_argument("--max-paths", type=int, default=None, help="máximo de caminhos simples")
+    parser.add_argument("--min-depth", type=int, default=None, help="profundidade BFS mínima do alvo")
+    parser.add_argument("--max-depth", type=int, default=None, help="profundidade BFS máxima do alvo")
+    parser.add_argument("--min-degree", type=float, default=None, help="grau médio mínimo")
+    parser.add_argument("--max-degree", type=float, default=None, help="grau médio máximo")
+    parser.add_argument("--max-crossings", type=int, default=None,
+                        help="máximo de cruzamentos de arestas no desenho")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    filters = Filters(args.min_paths, args.max_paths, args.min_depth, args.max_depth,
+                      args.min_degree, args.max_degree, args.max_crossings)
+    accepted, candidates, elapsed = generate_bank(
+        args.output, args.count, filters, args.nodes, args.seed,
+        args.workers, args.max_candidates)
+    print(f"{accepted} puzzles gravados em {args.output}: {candidates} candidatos em "
+          f"{elapsed:.2f} s ({candidates / elapsed:.0f} grafos/s)")
+    if accepted < args.count:
+        print("Aviso: limite de candidatos atingido antes do número pedido.")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
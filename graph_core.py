@@ -0,0 +1,1152 @@
+"""
+Cyber Nexus - Núcleo de grafos (sem pygame)
+Modelo do grafo, geração aleatória, contagem de caminhos e verificação de
+BFS/DFS. Pode ser importado e testado sem janela nem pygame.
+"""
+
+import heapq
+import random
+import math
+import time
+from array import array
+from collections import deque, namedtuple
+from enum import Enum
+
+class Node:
+    __slots__ = ("id", "index", "x", "y", "is_target", "visited", "in_path",
+                 "neighbors", "radius", "glow", "selected", "hovered")
+    
+    def __init__(self, id, x, y, is_target=False):
+        self.id = id
+        # Posição em Graph.nodes (ID inteiro usado pelos algoritmos)
+        self.index = -1
+        self.x = x
+        self.y = y
+        self.is_target = is_target
+        self.visited = False
+        self.in_path = False
+        self.neighbors = []
+        self.radius = 35
+        self.glow = 0
+        self.selected = False
+        self.hovered = False
+    
+    def contains_point(self, x, y):
+        dx = self.x - x
+        dy = self.y - y
+        return dx * dx + dy * dy <= self.radius * self.radius
+
+class Edge:
+    __slots__ = ("node1", "node2", "weight", "player_selected")
+    
+    def __init__(self, node1, node2, weight=1):
+        self.node1 = node1
+        self.node2 = node2
+        # Custo da aresta (1 nas fases sem peso)
+        self.weight = weight
+        self.player_selected = False
+
+# Tamanho da célula do índice espacial (maior que o diâmetro de um nó)
+SPATIAL_CELL_SIZE = 80
+
+class SpatialIndex:
+    """Grade uniforme para consultas de ponto e raio em tempo ~constante"""
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.max_radius = 0
+        # Extensão das células ocupadas (limita as buscas em anel)
+        self.bounds = None
+        
+    def cell_of(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+        
+    def insert(self, node):
+        cell = self.cell_of(node.x, node.y)
+        self.cells.setdefault(cell, []).append(node)
+        self.max_radius = max(self.max_radius, node.radius)
+        if self.bounds is None:
+            self.bounds = [cell[0], cell[1], cell[0], cell[1]]
+        else:
+            b = self.bounds
+            b[0] = min(b[0], cell[0])
+            b[1] = min(b[1], cell[1])
+            b[2] = max(b[2], cell[0])
+            b[3] = max(b[3], cell[1])
+        
+    def any_within(self, x, y, radius):
+        """Existe algum nó a menos de `radius` de (x, y)?"""
+        x0, y0 = self.cell_of(x - radius, y - radius)
+        x1, y1 = self.cell_of(x + radius, y + radius)
+        r2 = radius * radius
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for node in self.cells.get((cx, cy), ()):
+                    dx = node.x - x
+                    dy = node.y - y
+                    if dx * dx + dy * dy < r2:
+                        return True
+        return False
+        
+    def ring_cells(self, cx, cy, ring):
+        """Células a exatamente `ring` células de distância (Chebyshev)"""
+        if ring == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-ring, ring + 1):
+            yield (cx + dx, cy - ring)
+            yield (cx + dx, cy + ring)
+        for dy in range(-ring + 1, ring):
+            yield (cx - ring, cy + dy)
+            yield (cx + ring, cy + dy)
+        
+    def nearest_k(self, x, y, k, accept=None):
+        """Até k nós mais próximos de (x, y), em ordem de distância.
+        
+        Busca em anéis de células crescentes; para quando nenhum anel mais
+        distante pode conter um nó mais próximo que o k-ésimo encontrado.
+        """
+        if self.bounds is None:
+            return []
+        cx, cy = self.cell_of(x, y)
+        b = self.bounds
+        max_ring = max(cx - b[0], b[2] - cx, cy - b[1], b[3] - cy)
+        cells = self.cells
+        found = []
+        ring = 0
+        while ring <= max_ring:
+            for cell in self.ring_cells(cx, cy, ring):
+                for node in cells.get(cell, ()):
+                    if accept is None or accept(node):
+                        dx = node.x - x
+                        dy = node.y - y
+                        found.append((dx * dx + dy * dy, len(found), node))
+            # Nós em anéis seguintes estão a pelo menos ring * cell_size
+            if len(found) >= k:
+                reach = ring * self.cell_size
+                reach2 = reach * reach
+                if sum(1 for item in found if item[0] <= reach2) >= k:
+                    break
+            ring += 1
+        found.sort()
+        return [node for _, _, node in found[:k]]
+        
+    def nearest(self, x, y, accept=None):
+        found = self.nearest_k(x, y, 1, accept)
+        return found[0] if found else None
+        
+    def query_radius(self, x, y, radius):
+        """Nós cujo centro está a no máximo `radius` de (x, y)"""
+        x0, y0 = self.cell_of(x - radius, y - radius)
+        x1, y1 = self.cell_of(x + radius, y + radius)
+        r2 = radius * radius
+        found = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for node in self.cells.get((cx, cy), ()):
+                    dx = node.x - x
+                    dy = node.y - y
+                    if dx * dx + dy * dy <= r2:
+                        found.append(node)
+        return found
+        
+    def query_rect(self, x0, y0, x1, y1):
+        """Nós cujo centro está no retângulo [x0, x1] × [y0, y1]"""
+        cx0, cy0 = self.cell_of(x0, y0)
+        cx1, cy1 = self.cell_of(x1, y1)
+        if self.bounds is not None:
+            b = self.bounds
+            cx0, cy0 = max(cx0, b[0]), max(cy0, b[1])
+            cx1, cy1 = min(cx1, b[2]), min(cy1, b[3])
+        found = []
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                for node in self.cells.get((cx, cy), ()):
+                    if x0 <= node.x <= x1 and y0 <= node.y <= y1:
+                        found.append(node)
+        return found
+        
+    def query_point(self, x, y):
+        """Nó mais próximo que contém o ponto, ou None"""
+        best = None
+        best_dist = None
+        for node in self.query_radius(x, y, self.max_radius):
+            if node.contains_point(x, y):
+                dist = (node.x - x) ** 2 + (node.y - y) ** 2
+                if best is None or dist < best_dist:
+                    best = node
+                    best_dist = dist
+        return best
+
+# Células da grade de arestas (cada aresta entra em todas as células do
+# seu retângulo envolvente; arestas do gerador têm no máximo ~600 px)
+EDGE_CELL_SIZE = 160
+
+def edge_key(i, j):
+    """Chave inteira de uma aresta não direcionada entre os índices i e j"""
+    return (i << 32) | j if i < j else (j << 32) | i
+
+class Graph:
+    def __init__(self):
+        self.nodes = []
+        self.edges = []
+        self.start_node = None
+        self.target_node = None
+        
+        # Versão da estrutura (invalida as camadas em cache)
+        self.version = 0
+        # Elementos fora do estado padrão, desenhados na camada dinâmica
+        self.active_nodes = set()
+        self.active_edges = []
+        
+        # Arestas indexadas pelo par de índices (menor << 32 | maior)
+        self.edge_map = {}
+        # Adjacência compacta (CSR) para os algoritmos, reconstruída sob demanda
+        self.csr = None
+        self.csr_key = None
+        # Camadas BFS do início e do alvo, calculadas uma vez por grafo
+        self.bfs_cache = None
+        self.bfs_key = None
+        # Arestas com custos próprios (fase ponderada) e a árvore de
+        # caminhos mínimos (Dijkstra) a partir do início
+        self.weighted = False
+        self.weights_version = 0
+        self.edge_weights = None
+        self.spt_cache = None
+        self.spt_key = None
+        
+        self.spatial = SpatialIndex()
+        # Grade de arestas para recorte pela câmera, reconstruída sob demanda
+        self.edge_grid = None
+        self.edge_grid_key = None
+        self.hovered_node = None
+        
+    def add_node(self, node):
+        node.index = len(self.nodes)
+        self.nodes.append(node)
+        self.spatial.insert(node)
+        if node.is_target:
+            self.target_node = node
+        self.version += 1
+        
+    def add_edge(self, node1, node2, weight=1):
+        edge = Edge(node1, node2, weight)
+        self.edges.append(edge)
+        self.edge_map[edge_key(node1.index, node2.index)] = edge
+        node1.neighbors.append(node2)
+        node2.neighbors.append(node1)
+        self.version += 1
+        return edge
+        
+    def get_edge(self, node1, node2):
+        return self.edge_map.get(edge_key(node1.index, node2.index))
+        
+    def are_adjacent(self, node1, node2):
+        return edge_key(node1.index, node2.index) in self.edge_map
+        
+    def adjacency(self):
+        """Adjacência CSR: vizinhos de i são targets[offsets[i]:offsets[i + 1]].
+        
+        Mantém a ordem de Node.neighbors; só é reconstruída quando nós ou
+        arestas são adicionados.
+        """
+        key = (len(self.nodes), len(self.edges))
+        if self.csr_key != key:
+            offsets = array('i', [0])
+            targets = array('i')
+            for node in self.nodes:
+                targets.extend([n.index for n in node.neighbors])
+                offsets.append(len(targets))
+            self.csr = (offsets, targets)
+            self.csr_key = key
+        return self.csr
+        
+    def adjacency_weights(self):
+        """Custos alinhados a adjacency(): weights[k] é o custo de targets[k]"""
+        self.adjacency()
+        key = (self.csr_key, self.weights_version)
+        if self.edge_weights is None or self.edge_weights[0] != key:
+            weights = array('i')
+            for node in self.nodes:
+                i = node.index
+                weights.extend([self.edge_map[edge_key(i, n.index)].weight for n in node.neighbors])
+            self.edge_weights = (key, weights)
+        return self.edge_weights[1]
+        
+    def shortest_path_tree(self):
+        """Distâncias ponderadas e pais a partir do início (Dijkstra), em cache"""
+        key = (len(self.nodes), len(self.edges), self.start_node, self.weights_version)
+        if self.spt_key != key:
+            distance, parent, _ = dijkstra(self, self.start_node)
+            self.spt_cache = ShortestPathTree(distance, parent)
+            self.spt_key = key
+        return self.spt_cache
+        
+    def bfs_info(self):
+        """Distâncias BFS, pais e contagem de caminhos mínimos (BfsInfo) em cache.
+        
+        Recalculado só quando nós/arestas são adicionados ou início/alvo mudam.
+        """
+        key = (len(self.nodes), len(self.edges), self.start_node, self.target_node)
+        if self.bfs_key != key:
+            self.bfs_cache = compute_bfs_info(self)
+            self.bfs_key = key
+        return self.bfs_cache
+        
+    def edges_in_rect(self, x0, y0, x1, y1):
+        """Arestas cujo retângulo envolvente toca [x0, x1] × [y0, y1]"""
+        if self.edge_grid_key != len(self.edges):
+            grid = {}
+            for edge in self.edges:
+                a, b = edge.node1, edge.node2
+                for cx in range(int(min(a.x, b.x) // EDGE_CELL_SIZE),
+                                int(max(a.x, b.x) // EDGE_CELL_SIZE) + 1):
+                    for cy in range(int(min(a.y, b.y) // EDGE_CELL_SIZE),
+                                    int(max(a.y, b.y) // EDGE_CELL_SIZE) + 1):
+                        grid.setdefault((cx, cy), []).append(edge)
+            self.edge_grid = grid
+            self.edge_grid_key = len(self.edges)
+        
+        found = []
+        seen = set()
+        grid = self.edge_grid
+        for cx in range(int(x0 // EDGE_CELL_SIZE), int(x1 // EDGE_CELL_SIZE) + 1):
+            for cy in range(int(y0 // EDGE_CELL_SIZE), int(y1 // EDGE_CELL_SIZE) + 1):
+                for edge in grid.get((cx, cy), ()):
+                    if id(edge) in seen:
+                        continue
+                    seen.add(id(edge))
+                    a, b = edge.node1, edge.node2
+                    if (min(a.x, b.x) <= x1 and max(a.x, b.x) >= x0 and
+                            min(a.y, b.y) <= y1 and max(a.y, b.y) >= y0):
+                        found.append(edge)
+        return found
+        
+    def bounds(self):
+        """Retângulo (x0, y0, x1, y1) que envolve os nós, com seus raios"""
+        if not self.nodes:
+            return None
+        return (min(node.x - node.radius for node in self.nodes),
+                min(node.y - node.radius for node in self.nodes),
+                max(node.x + node.radius for node in self.nodes),
+                max(node.y + node.radius for node in self.nodes))
+        
+    def add_to_path(self, node):
+        node.in_path = True
+        self.active_nodes.add(node)
+        
+    def select_edge(self, edge):
+        if not edge.player_selected:
+            edge.player_selected = True
+            self.active_edges.append(edge)
+        
+    def node_at(self, x, y):
+        return self.spatial.query_point(x, y)
+        
+    def set_hover(self, node):
+        """Atualiza o nó sob o mouse; retorna True se mudou"""
+        old = self.hovered_node
+        if node is old:
+            return False
+        if old is not None:
+            old.hovered = False
+            if not (old.in_path or old.selected or old.glow > 0):
+                self.active_nodes.discard(old)
+        if node is not None:
+            node.hovered = True
+            self.active_nodes.add(node)
+        self.hovered_node = node
+        return True
+        
+    def reset(self):
+        for node in self.nodes:
+            node.visited = False
+            node.in_path = False
+            node.selected = False
+            node.hovered = False
+        for edge in self.edges:
+            edge.player_selected = False
+        self.hovered_node = None
+        self.active_nodes.clear()
+        self.active_edges = []
+        self.version += 1
+
+# Gerador: distância mínima entre nós e até quantos nós a árvore geradora
+# considera todos os pares (acima disso, só pares de células vizinhas)
+GENERATOR_MIN_DISTANCE = 120
+GENERATOR_ALL_PAIRS_MAX = 64
+# Em áreas densas a distância mínima cai para esta fração do espaçamento
+# médio √(área/n), senão a amostragem por rejeição satura
+GENERATOR_SPACING_FRACTION = 0.7
+# Lado da célula da grade, em espaçamentos médios (~2 nós por célula)
+GENERATOR_CELL_SPACINGS = 1.5
+
+class UnionFind:
+    """Conjuntos disjuntos com compressão de caminho e união por tamanho"""
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.size = [1] * size
+        self.components = size
+        
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+        
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        self.components -= 1
+        return True
+
+def graph_bounds(num_nodes):
+    """Área de geração: a tela padrão até 12 nós, depois proporcional a √n"""
+    if num_nodes <= 12:
+        return 250, 1670, 250, 750
+    side = int(math.sqrt(num_nodes) * 180)
+    return 0, side, 0, side
+
+def derive_seed(seed, *parts):
+    """Semente estável do item `parts` (ex.: "fase", 3) de uma sessão com semente `seed`"""
+    return random.Random(":".join(str(part) for part in (seed,) + parts)).getrandbits(63)
+
+def generate_random_graph(num_nodes=12, min_x=250, max_x=1670, min_y=250, max_y=750,
+                          weighted=False, seed=None):
+    """Gera um grafo aleatório conectado com múltiplos caminhos (com custos, se weighted).
+    
+    Com `seed` o grafo é reproduzível e o estado global de `random` não é
+    tocado; é o mesmo grafo obtido com random.seed(seed) seguido da geração.
+    
+    O custo é ~O(n log n) em qualquer área: 10.000 nós levam cerca de 0,8 s,
+    quase metade no posicionamento por rejeição (que consome `rng` na mesma
+    ordem de sempre, para os grafos com semente não mudarem).
+    """
+    rng = random.Random(seed) if seed is not None else random
+    randint = rng.randint
+    graph = Graph()
+    nodes = []
+    
+    # Grade própria do gerador, com células proporcionais à densidade
+    # esperada (poucos nós por célula nas buscas por vizinhos e nos pares
+    # candidatos da árvore, em qualquer área)
+    area = max(1, (max_x - min_x) * (max_y - min_y))
+    spacing = math.sqrt(area / max(1, num_nodes))
+    min_distance = min(GENERATOR_MIN_DISTANCE, spacing * GENERATOR_SPACING_FRACTION)
+    grid = SpatialIndex(spacing * GENERATOR_CELL_SPACINGS)
+    any_within = grid.any_within
+    
+    # Criar nós com posições aleatórias (Poisson-disk com grade espacial)
+    for i in range(num_nodes):
+        attempts = 0
+        while attempts < 50:
+            x = randint(min_x, max_x)
+            y = randint(min_y, max_y)
+            
+            # Verificar distância mínima só nas células vizinhas
+            if not any_within(x, y, min_distance):
+                break
+            attempts += 1
+        
+        is_target = (i == num_nodes - 1)
+        node = Node(i + 1, x, y, is_target)
+        nodes.append(node)
+        graph.add_node(node)
+        grid.insert(node)
+    
+    # Primeiro nó é o inicial
+    graph.start_node = nodes[0]
+    
+    # FASE 1: Criar árvore geradora mínima (Kruskal + union-find).
+    # Em grafos pequenos todos os pares são candidatos; nos grandes,
+    # apenas pares na mesma célula da grade ou em células vizinhas.
+    # Cada candidato é o inteiro d² << 2b | i << b | j (b bits por índice):
+    # ordená-los dá a mesma ordem das tuplas (d², i, j), bem mais rápido.
+    bits = num_nodes.bit_length()
+    mask = (1 << bits) - 1
+    candidates = []
+    if num_nodes <= GENERATOR_ALL_PAIRS_MAX:
+        for i in range(num_nodes):
+            for j in range(i + 1, num_nodes):
+                a, b = nodes[i], nodes[j]
+                candidates.append(((a.x - b.x) ** 2 + (a.y - b.y) ** 2 << bits | i) << bits | j)
+    else:
+        cells = grid.cells
+        for (cx, cy), members in cells.items():
+            # Metade da vizinhança, para gerar cada par uma única vez
+            for dx, dy in ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)):
+                others = cells.get((cx + dx, cy + dy))
+                if not others:
+                    continue
+                for k, a in enumerate(members):
+                    ax, ay, i = a.x, a.y, a.index
+                    for b in (members[k + 1:] if dx == 0 and dy == 0 else others):
+                        ex, ey = ax - b.x, ay - b.y
+                        candidates.append((ex * ex + ey * ey << bits | i) << bits | b.index)
+    candidates.sort()
+    
+    components = UnionFind(num_nodes)
+    for key in candidates:
+        i, j = key >> bits & mask, key & mask
+        if components.union(i, j):
+            graph.add_edge(nodes[i], nodes[j])
+            if components.components == 1:
+                break
+    
+    # Componentes que os candidatos deixaram isolados: ligar ao nó mais
+    # próximo de outro componente
+    if components.components > 1:
+        for i, node in enumerate(nodes):
+            root = components.find(i)
+            if root == components.find(0):
+                continue
+            other = grid.nearest(
+                node.x, node.y,
+                accept=lambda n: components.find(n.index) != root)
+            if other is not None:
+                components.union(i, other.index)
+                graph.add_edge(other, node)
+    
+    # FASE 2: Adicionar arestas extras
+    target_node = nodes[-1]
+    potential_target_connections = []
+    
+    for node in grid.query_radius(target_node.x, target_node.y, 500):
+        if node != target_node and not graph.are_adjacent(node, target_node):
+            dist = math.sqrt((node.x - target_node.x)**2 + (node.y - target_node.y)**2)
+            potential_target_connections.append((node, dist))
+    
+    potential_target_connections.sort(key=lambda x: x[1])
+    num_target_edges = min(4, len(potential_target_connections))
+    
+    for i in range(num_target_edges):
+        node = potential_target_connections[i][0]
+        if not graph.are_adjacent(node, target_node):
+            graph.add_edge(node, target_node)
+    
+    # Adicionar mais arestas para conectar o grafo
+    num_extra_edges = rng.randint(num_nodes * 2, num_nodes * 3)
+    max_dist = 600 if num_nodes > 10 else 500
+    
+    for _ in range(num_extra_edges):
+        node1 = rng.choice(nodes)
+        node2 = rng.choice(nodes)
+        
+        # Arestas da árvore já estão no grafo, então a checagem de
+        # adjacência também as exclui
+        if node1 != node2 and not graph.are_adjacent(node1, node2):
+            dist = math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
+            
+            if dist < max_dist:
+                prob = 0.7 - (dist / max_dist) * 0.4
+                if rng.random() < prob:
+                    graph.add_edge(node1, node2)
+    
+    # Garantir conectividade mínima: ligar ao vizinho não adjacente mais próximo
+    for node in nodes:
+        if node != graph.start_node and node != target_node:
+            if len(node.neighbors) < 2:
+                candidate = grid.nearest(
+                    node.x, node.y,
+                    accept=lambda n: n is not node and not graph.are_adjacent(node, n))
+                if candidate is not None:
+                    graph.add_edge(node, candidate)
+    
+    if weighted:
+        assign_weights(graph, rng)
+    
+    # Camadas BFS prontas desde a geração
+    graph.bfs_info()
+    
+    return graph
+
+# Fase ponderada: custo = comprimento × desvio aleatório / escala. Com
+# desvio >= 1, distância euclidiana / escala nunca superestima (A* ótimo)
+WEIGHT_SCALE = 10
+WEIGHT_DETOUR_MAX = 2.0
+
+def assign_weights(graph, rng=random):
+    """Dá a cada aresta um custo derivado do seu comprimento"""
+    for edge in graph.edges:
+        a, b = edge.node1, edge.node2
+        length = math.hypot(a.x - b.x, a.y - b.y)
+        edge.weight = max(1, math.ceil(length * rng.uniform(1.0, WEIGHT_DETOUR_MAX) / WEIGHT_SCALE))
+    graph.weighted = True
+    graph.weights_version += 1
+    graph.version += 1
+
+# Contagem de caminhos: limites para nunca travar um frame
+PATH_COUNT_BUDGET_MS = 3
+PATH_COUNT_EXACT_MAX_NODES = 24
+PATH_COUNT_CAP = 100000
+
+PathStats = namedtuple("PathStats", "simple_paths exact shortest_length shortest_paths")
+
+class PathCountTimeout(Exception):
+    pass
+
+BfsInfo = namedtuple("BfsInfo", "distance to_target parent ways length shortest_paths")
+
+def bfs_layers(graph, source):
+    """BFS completa sobre a adjacência CSR: (distâncias, pais, nº de caminhos mínimos)"""
+    offsets, targets = graph.adjacency()
+    num_nodes = len(graph.nodes)
+    dist = array('i', [-1]) * num_nodes
+    parent = array('i', [-1]) * num_nodes
+    ways = [0] * num_nodes
+    dist[source] = 0
+    parent[source] = source
+    ways[source] = 1
+    queue = deque([source])
+    while queue:
+        current = queue.popleft()
+        next_dist = dist[current] + 1
+        for k in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[k]
+            if dist[neighbor] < 0:
+                dist[neighbor] = next_dist
+                parent[neighbor] = current
+                ways[neighbor] = ways[current]
+                queue.append(neighbor)
+            elif dist[neighbor] == next_dist:
+                ways[neighbor] += ways[current]
+    return dist, parent, ways
+
+def compute_bfs_info(graph):
+    if graph.start_node is None or graph.target_node is None:
+        return BfsInfo(None, None, None, None, None, 0)
+    start, target = graph.start_node.index, graph.target_node.index
+    dist, parent, ways = bfs_layers(graph, start)
+    to_target, _, _ = bfs_layers(graph, target)
+    if dist[target] < 0:
+        return BfsInfo(dist, to_target, parent, ways, None, 0)
+    return BfsInfo(dist, to_target, parent, ways, dist[target], ways[target])
+
+def count_shortest_paths(graph):
+    """Distância e número de caminhos mínimos do início ao alvo (camadas BFS)"""
+    info = graph.bfs_info()
+    return info.length, info.shortest_paths
+
+def count_simple_paths_exact(graph, deadline, max_steps=None):
+    """Conta caminhos simples exatamente com DP sobre subconjuntos (bitmask).
+
+    memo[(v, visitados)] guarda quantos caminhos existem de v até o alvo sem
+    repetir nós. Levanta PathCountTimeout se passar do prazo ou de
+    `max_steps` estados calculados.
+    """
+    step_limit = math.inf if max_steps is None else max_steps
+    offsets, targets = graph.adjacency()
+    num_nodes = len(graph.nodes)
+    adjacency = [targets[offsets[i]:offsets[i + 1]] for i in range(num_nodes)]
+    target = graph.target_node.index
+    memo = {}
+    calls = [0]
+    
+    def count(v, mask):
+        if v == target:
+            return 1
+        key = mask * num_nodes + v
+        cached = memo.get(key)
+        if cached is not None:
+            return cached
+        calls[0] += 1
+        if calls[0] > step_limit or (calls[0] & 127 == 0 and time.perf_counter() > deadline):
+            raise PathCountTimeout()
+        total = 0
+        for u in adjacency[v]:
+            if not (mask >> u) & 1:
+                total += count(u, mask | (1 << u))
+        memo[key] = total
+        return total
+    
+    start = graph.start_node.index
+    return count(start, 1 << start)
+
+def count_simple_paths_bounded(graph, deadline, cap=PATH_COUNT_CAP, max_steps=None):
+    """Enumera caminhos simples até o prazo, o limite ou `max_steps` passos;
+    retorna (contagem, completo)"""
+    step_limit = math.inf if max_steps is None else max_steps
+    offsets, targets = graph.adjacency()
+    start, target = graph.start_node.index, graph.target_node.index
+    visited = bytearray(len(graph.nodes))
+    visited[start] = 1
+    # Pilha de (nó, próxima posição a explorar em targets)
+    stack = [[start, offsets[start]]]
+    found = 0
+    steps = 0
+    while stack:
+        steps += 1
+        if steps > step_limit or (steps & 511 == 0 and time.perf_counter() > deadline):
+            return found, False
+        top = stack[-1]
+        node = top[0]
+        end = offsets[node + 1]
+        advanced = False
+        while top[1] < end:
+            neighbor = targets[top[1]]
+            top[1] += 1
+            if visited[neighbor]:
+                continue
+            if neighbor == target:
+                found += 1
+                if found >= cap:
+                    return found, False
+                continue
+            visited[neighbor] = 1
+            stack.append([neighbor, offsets[neighbor]])
+            advanced = True
+            break
+        if not advanced:
+            stack.pop()
+            visited[node] = 0
+    return found, True
+
+def find_bfs_path(graph):
+    """Caminho do início ao alvo pela árvore de pais da BFS, ou None"""
+    info = graph.bfs_info()
+    if info.length is None:
+        return None
+    
+    # Reconstruir caminho a partir do alvo
+    start = graph.start_node.index
+    parent = info.parent
+    path = [graph.target_node.index]
+    while path[-1] != start:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return [graph.nodes[i] for i in path]
+
+# Busca ponderada: árvore de caminhos mínimos (índices de nós; -1 = sem pai)
+ShortestPathTree = namedtuple("ShortestPathTree", "distance parent")
+# Resultado de uma busca do início ao alvo, para comparar algoritmos
+SearchStats = namedtuple("SearchStats", "path cost expanded elapsed_ms")
+
+def dijkstra(graph, source, target=None):
+    """Dijkstra com heap binário sobre a CSR.
+    
+    Sem alvo, calcula a árvore completa; com alvo, para ao retirá-lo do
+    heap. Retorna (distâncias, pais, nós expandidos).
+    """
+    offsets, targets = graph.adjacency()
+    weights = graph.adjacency_weights()
+    n = len(graph.nodes)
+    distance = [math.inf] * n
+    parent = array('i', [-1]) * n
+    done = bytearray(n)
+    stop = target.index if target is not None else -1
+    
+    s = source.index
+    distance[s] = 0
+    heap = [(0, s)]
+    expanded = 0
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = 1
+        expanded += 1
+        if u == stop:
+            break
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < distance[v]:
+                distance[v] = nd
+                parent[v] = u
+                heapq.heappush(heap, (nd, v))
+    return distance, parent, expanded
+
+def astar(graph, source, target):
+    """A* com heap binário e heurística euclidiana / WEIGHT_SCALE.
+    
+    Retorna (custo, pais, nós expandidos); custo é inf se não há caminho.
+    """
+    offsets, targets = graph.adjacency()
+    weights = graph.adjacency_weights()
+    nodes = graph.nodes
+    n = len(nodes)
+    tx, ty = target.x, target.y
+    
+    def h(i):
+        node = nodes[i]
+        return math.hypot(node.x - tx, node.y - ty) / WEIGHT_SCALE
+    
+    g = [math.inf] * n
+    parent = array('i', [-1]) * n
+    done = bytearray(n)
+    s, t = source.index, target.index
+    g[s] = 0
+    heap = [(h(s), 0, s)]
+    expanded = 0
+    while heap:
+        _, d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = 1
+        expanded += 1
+        if u == t:
+            return d, parent, expanded
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < g[v]:
+                g[v] = nd
+                parent[v] = u
+                heapq.heappush(heap, (nd + h(v), nd, v))
+    return math.inf, parent, expanded
+
+def bfs_search(graph, source, target):
+    """BFS até retirar o alvo da fila; retorna (pais, nós expandidos)"""
+    offsets, targets = graph.adjacency()
+    parent = array('i', [-1]) * len(graph.nodes)
+    seen = bytearray(len(graph.nodes))
+    s, t = source.index, target.index
+    seen[s] = 1
+    queue = deque([s])
+    expanded = 0
+    while queue:
+        u = queue.popleft()
+        expanded += 1
+        if u == t:
+            break
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            if not seen[v]:
+                seen[v] = 1
+                parent[v] = u
+                queue.append(v)
+    return parent, expanded
+
+def path_from_parents(graph, parent, source, target):
+    """Caminho source -> target seguindo um vetor de pais, ou None"""
+    path = [target.index]
+    while path[-1] != source.index:
+        p = parent[path[-1]]
+        if p < 0:
+            return None
+        path.append(p)
+    path.reverse()
+    return [graph.nodes[i] for i in path]
+
+def path_cost(graph, path):
+    return sum(graph.get_edge(a, b).weight for a, b in zip(path, path[1:]))
+
+def compare_searches(graph):
+    """BFS, Dijkstra e A* do início ao alvo: caminho, custo, expansões e tempo"""
+    source, target = graph.start_node, graph.target_node
+    # Estruturas compartilhadas prontas antes de cronometrar
+    graph.adjacency_weights()
+    results = {}
+    
+    started = time.perf_counter()
+    parent, expanded = bfs_search(graph, source, target)
+    elapsed = (time.perf_counter() - started) * 1000
+    path = path_from_parents(graph, parent, source, target)
+    results["BFS"] = SearchStats(path, path_cost(graph, path) if path else math.inf,
+                                 expanded, elapsed)
+    
+    started = time.perf_counter()
+    distance, parent, expanded = dijkstra(graph, source, target)
+    elapsed = (time.perf_counter() - started) * 1000
+    results["Dijkstra"] = SearchStats(path_from_parents(graph, parent, source, target),
+                                      distance[target.index], expanded, elapsed)
+    
+    started = time.perf_counter()
+    cost, parent, expanded = astar(graph, source, target)
+    elapsed = (time.perf_counter() - started) * 1000
+    results["A*"] = SearchStats(path_from_parents(graph, parent, source, target),
+                                cost, expanded, elapsed)
+    return results
+
+def find_weighted_path(graph):
+    """Caminho de custo mínimo pela árvore de Dijkstra, ou None"""
+    tree = graph.shortest_path_tree()
+    if tree.distance[graph.target_node.index] == math.inf:
+        return None
+    return path_from_parents(graph, tree.parent, graph.start_node, graph.target_node)
+
+class TraversalEvent(Enum):
+    ENQUEUE = 0   # BFS: nó descoberto entra na fila
+    DEQUEUE = 1   # BFS: nó sai da fila e é expandido
+    PUSH = 2      # DFS: nó descoberto entra na pilha
+    POP = 3       # DFS: todos os vizinhos explorados, nó sai da pilha
+    FOUND = 4     # Alvo alcançado; a travessia termina
+
+# parent: nó pelo qual `node` foi descoberto (None na origem)
+TraversalStep = namedtuple("TraversalStep", "event node parent")
+
+def bfs_steps(graph, source=None, target=None):
+    """BFS como gerador: um TraversalStep por mudança na fila"""
+    source = source or graph.start_node
+    target = target or graph.target_node
+    parent = {source: None}
+    queue = deque([source])
+    yield TraversalStep(TraversalEvent.ENQUEUE, source, None)
+    while queue:
+        node = queue.popleft()
+        yield TraversalStep(TraversalEvent.DEQUEUE, node, parent[node])
+        if node is target:
+            yield TraversalStep(TraversalEvent.FOUND, node, parent[node])
+            return
+        for neighbor in node.neighbors:
+            if neighbor not in parent:
+                parent[neighbor] = node
+                queue.append(neighbor)
+                yield TraversalStep(TraversalEvent.ENQUEUE, neighbor, node)
+
+def dfs_steps(graph, source=None, target=None):
+    """DFS iterativa como gerador, na ordem de Node.neighbors (como a recursiva)"""
+    source = source or graph.start_node
+    target = target or graph.target_node
+    parent = {source: None}
+    stack = [(source, iter(source.neighbors))]
+    yield TraversalStep(TraversalEvent.PUSH, source, None)
+    if source is target:
+        yield TraversalStep(TraversalEvent.FOUND, source, None)
+        return
+    while stack:
+        node, neighbors = stack[-1]
+        for neighbor in neighbors:
+            if neighbor not in parent:
+                parent[neighbor] = node
+                stack.append((neighbor, iter(neighbor.neighbors)))
+                yield TraversalStep(TraversalEvent.PUSH, neighbor, node)
+                if neighbor is target:
+                    yield TraversalStep(TraversalEvent.FOUND, neighbor, node)
+                    return
+                break
+        else:
+            stack.pop()
+            yield TraversalStep(TraversalEvent.POP, node, parent[node])
+
+def analyze_paths(graph, budget_ms=PATH_COUNT_BUDGET_MS, max_steps=None):
+    """Estatísticas de caminhos sem bloquear mais que o orçamento de tempo.
+
+    Caminhos mínimos são sempre exatos (BFS). Caminhos simples são exatos
+    via DP em grafos pequenos; caso contrário (ou se o prazo estourar),
+    retorna um limite inferior com exact=False ("≥ N"). Com budget_ms=None
+    e `max_steps` (passos de cada contagem) o resultado não depende da
+    carga da máquina.
+    """
+    # Um único prazo para tudo: o fallback não ganha um orçamento novo
+    deadline = math.inf if budget_ms is None else time.perf_counter() + budget_ms / 1000.0
+    shortest_length, shortest_paths = count_shortest_paths(graph)
+    if shortest_length is None:
+        return PathStats(0, True, None, 0)
+    
+    if len(graph.nodes) <= PATH_COUNT_EXACT_MAX_NODES:
+        try:
+            total = count_simple_paths_exact(graph, deadline, max_steps)
+            return PathStats(total, True, shortest_length, shortest_paths)
+        except PathCountTimeout:
+            pass
+    
+    found, complete = count_simple_paths_bounded(graph, deadline, max_steps=max_steps)
+    return PathStats(max(found, shortest_paths), complete, shortest_length, shortest_paths)
+
+def average_degree(graph):
+    if not graph.nodes:
+        return 0.0
+    return 2 * len(graph.edges) / len(graph.nodes)
+
+def _orientation(ax, ay, bx, by, cx, cy):
+    cross = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    return (cross > 0) - (cross < 0)
+
+def segments_cross(p1, p2, q1, q2):
+    """Os segmentos p1-p2 e q1-q2 se cruzam no interior? (pontas comuns não contam)"""
+    d1 = _orientation(*q1, *q2, *p1)
+    d2 = _orientation(*q1, *q2, *p2)
+    d3 = _orientation(*p1, *p2, *q1)
+    d4 = _orientation(*p1, *p2, *q2)
+    return d1 * d2 < 0 and d3 * d4 < 0
+
+def count_edge_crossings(graph):
+    """Número de pares de arestas que se cruzam no desenho (O(m²))"""
+    segments = [(edge.node1.index, edge.node2.index,
+                 (edge.node1.x, edge.node1.y), (edge.node2.x, edge.node2.y))
+                for edge in graph.edges]
+    crossings = 0
+    for k, (a1, a2, p1, p2) in enumerate(segments):
+        for b1, b2, q1, q2 in segments[k + 1:]:
+            if a1 == b1 or a1 == b2 or a2 == b1 or a2 == b2:
+                continue
+            if segments_cross(p1, p2, q1, q2):
+                crossings += 1
+    return crossings
+
+
+class VerifyStatus(Enum):
+    EMPTY = 0        # Nenhum caminho criado
+    INCOMPLETE = 1   # Caminho não termina no alvo
+    INVALID = 2      # Não sai do início, repete nós ou pula entre não vizinhos
+    NO_PATH = 3      # O grafo não liga início e alvo
+    SUBOPTIMAL = 4   # Caminho válido, mas não é o esperado pela BFS
+    SUCCESS = 5
+
+VerificationResult = namedtuple("VerificationResult", "status path reference")
+
+def is_connected_path(graph, path):
+    """Todos os nós consecutivos do caminho são vizinhos?"""
+    for i in range(len(path) - 1):
+        if not graph.are_adjacent(path[i], path[i + 1]):
+            return False
+    return True
+
+def is_simple_path(graph, path):
+    """Começa no nó inicial, não repete nós e liga sempre nós vizinhos?"""
+    return (path[0] == graph.start_node and len(set(path)) == len(path)
+            and is_connected_path(graph, path))
+
+def is_shortest_path(graph, path):
+    """O caminho segue as camadas BFS (distância i no passo i) até o alvo?
+    
+    Aceita qualquer caminho mínimo, não só o da árvore de pais. O(len(path))
+    usando as distâncias em cache.
+    """
+    info = graph.bfs_info()
+    if info.length is None or len(path) != info.length + 1:
+        return False
+    distance = info.distance
+    for i, node in enumerate(path):
+        if distance[node.index] != i:
+            return False
+    return path[-1] == graph.target_node
+
+def check_bfs_path(graph, path):
+    """Verifica se `path` é um caminho mínimo (BFS) do início ao alvo.
+    
+    Qualquer caminho mínimo é aceito. Em SUBOPTIMAL, `reference` traz um
+    caminho BFS correto (o da árvore de pais).
+    """
+    if not path:
+        return VerificationResult(VerifyStatus.EMPTY, path, None)
+    if path[-1] != graph.target_node:
+        return VerificationResult(VerifyStatus.INCOMPLETE, path, None)
+    if graph.bfs_info().length is None:
+        return VerificationResult(VerifyStatus.NO_PATH, path, None)
+    if not is_simple_path(graph, path):
+        return VerificationResult(VerifyStatus.INVALID, path, None)
+    if is_shortest_path(graph, path):
+        return VerificationResult(VerifyStatus.SUCCESS, path, None)
+    return VerificationResult(VerifyStatus.SUBOPTIMAL, path, find_bfs_path(graph))
+
+def check_dfs_path(graph, path):
+    """Verifica se `path` é um caminho DFS válido do início ao alvo"""
+    if not path:
+        return VerificationResult(VerifyStatus.EMPTY, path, None)
+    if path[-1] != graph.target_node:
+        return VerificationResult(VerifyStatus.INCOMPLETE, path, None)
+    if not is_simple_path(graph, path):
+        return VerificationResult(VerifyStatus.INVALID, path, None)
+    return VerificationResult(VerifyStatus.SUCCESS, path, None)
+
+def check_weighted_path(graph, path):
+    """Verifica se `path` é de custo mínimo do início ao alvo, em O(len(path)).
+    
+    Usa a árvore de caminhos mínimos pré-calculada: o caminho é ótimo se
+    toda aresta (u, v) é "justa", isto é, dist[u] + custo = dist[v].
+    """
+    if not path:
+        return VerificationResult(VerifyStatus.EMPTY, path, None)
+    if path[-1] != graph.target_node:
+        return VerificationResult(VerifyStatus.INCOMPLETE, path, None)
+    distance = graph.shortest_path_tree().distance
+    if distance[graph.target_node.index] == math.inf:
+        return VerificationResult(VerifyStatus.NO_PATH, path, None)
+    if not is_simple_path(graph, path):
+        return VerificationResult(VerifyStatus.INVALID, path, None)
+    optimal = True
+    for a, b in zip(path, path[1:]):
+        if distance[a.index] + graph.get_edge(a, b).weight != distance[b.index]:
+            optimal = False
+    if optimal:
+        return VerificationResult(VerifyStatus.SUCCESS, path, None)
+    return VerificationResult(VerifyStatus.SUBOPTIMAL, path, find_weighted_path(graph))
+
+class ClickResult(Enum):
+    STARTED = 0          # Primeiro nó (início) adicionado
+    ADDED = 1
+    REACHED_TARGET = 2
+    NOT_START = 3        # Caminho precisa começar pelo nó inicial
+    ALREADY_IN_PATH = 4
+    NOT_NEIGHBOR = 5
+
+class PathValidator:
+    """Validação incremental do caminho do jogador, O(1) por clique.
+    
+    Mantém o conjunto de nós do caminho e, com as distâncias BFS em cache,
+    se o prefixo ainda está sobre algum caminho mínimo até o alvo. Um
+    caminho simples montado com cliques em vizinhos é sempre um ramo
+    válido de DFS; `dead_end` indica quando a DFS precisaria retroceder.
+    """
+    def __init__(self, graph):
+        self.graph = graph
+        self.path = []
+        self.members = set()
+        self.on_shortest = True
+        self.dead_end = False
+        
+    def add(self, node):
+        graph = self.graph
+        if not self.path:
+            if node != graph.start_node:
+                return ClickResult.NOT_START
+        elif node in self.members:
+            return ClickResult.ALREADY_IN_PATH
+        elif not graph.are_adjacent(self.path[-1], node):
+            return ClickResult.NOT_NEIGHBOR
+        
+        self.path.append(node)
+        self.members.add(node)
+        self.update_shortest(node)
+        
+        if node == graph.target_node:
+            self.dead_end = False
+            return ClickResult.REACHED_TARGET
+        self.dead_end = all(n in self.members for n in node.neighbors)
+        return ClickResult.STARTED if len(self.path) == 1 else ClickResult.ADDED
+        
+    def update_shortest(self, node):
+        if not self.on_shortest:
+            return
+        info = self.graph.bfs_info()
+        step = len(self.path) - 1
+        i = node.index
+        if (info.length is None or info.distance[i] != step or
+                info.distance[i] + info.to_target[i] != info.length):
+            self.on_shortest = False
+        
+    @property
+    def complete(self):
+        return bool(self.path) and self.path[-1] == self.graph.target_node
+        
+    def check_bfs(self):
+        """Mesmo resultado de check_bfs_path, em tempo constante"""
+        if not self.path:
+            return VerificationResult(VerifyStatus.EMPTY, self.path, None)
+        if not self.complete:
+            return VerificationResult(VerifyStatus.INCOMPLETE, self.path, None)
+        if self.graph.bfs_info().length is None:
+            return VerificationResult(VerifyStatus.NO_PATH, self.path, None)
+        if self.on_shortest:
+            return VerificationResult(VerifyStatus.SUCCESS, self.path, None)
+        return VerificationResult(VerifyStatus.SUBOPTIMAL, self.path, find_bfs_path(self.graph))
+        
+    def check_dfs(self):
+        """Mesmo resultado de check_dfs_path, em tempo constante"""
+        if not self.path:
+            return VerificationResult(VerifyStatus.EMPTY, self.path, None)
+        if not self.complete:
+            return VerificationResult(VerifyStatus.INCOMPLETE, self.path, None)
+        return VerificationResult(VerifyStatus.SUCCESS, self.path, None)
+        
+    def check_weighted(self):
+        """Mesmo resultado de check_weighted_path (O(tamanho do caminho))"""
+        return check_weighted_path(self.graph, self.path)
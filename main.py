@@ -5,21 +5,35 @@ Autores: Pedro Henrique Faria e Caio Leal Granja
 Versão Corrigida para 1920x1080 - Bug de botões corrigido
 """
 
-import pygame
-import sys
-import random
+import argparse
+import csv
 import math
-from collections import deque
+import os
+import random
+import sys
+import time
+from collections import OrderedDict, deque
 from enum import Enum
 
-# Inicialização do Pygame
-pygame.init()
+import pygame
+
+from graph_core import (ClickResult, Graph, Node, PathValidator, TraversalEvent,
+                        VerifyStatus, analyze_paths, assign_weights, average_degree,
+                        bfs_steps, compare_searches, derive_seed, dfs_steps,
+                        generate_random_graph, graph_bounds, path_cost)
+from prefetch import PREFETCH_DEPTH, PuzzlePrefetcher
+from puzzle_bank import PuzzleBank, load_graph, save_graph
+from replay import ReplaySource, SessionInfo, SessionRecorder, read_log, replay_report
 
 # Constantes para 1920x1080
 SCREEN_WIDTH = 1920
 SCREEN_HEIGHT = 1080
 FPS = 60
 
+# Ritmo de quadros: FPS completo só com animação ativa
+IDLE_FPS = 30
+IDLE_TIMEOUT_MS = 500
+
 # Cores Cyberpunk
 COLOR_BG = (10, 10, 25)
 COLOR_GRID = (20, 20, 40)
@@ -37,6 +51,457 @@ COLOR_BUTTON = (30, 30, 60)
 COLOR_BUTTON_HOVER = (50, 50, 100)
 COLOR_SUCCESS = (0, 255, 100)
 COLOR_ERROR = (255, 50, 50)
+COLOR_WARNING = (255, 255, 0)
+COLOR_EDGE_WEIGHT = (200, 200, 255)
+
+# Câmera: zoom em passos discretos (sprites escalados ficam em cache por
+# nível); abaixo de LOD_ZOOM os nós viram círculos simples, sem rótulo
+ZOOM_STEP = 1.25
+ZOOM_MIN_LEVEL = -10
+ZOOM_MAX_LEVEL = 4
+LOD_ZOOM = 0.6
+# Margem (mundo) do recorte: nós e brilhos (2 raios) parcialmente visíveis
+NODE_RADIUS_MARGIN = 70
+# Alcance (mundo) de uma aresta do caminho sobre os nós por onde ela passa:
+# meia largura da linha; com pesos, o rótulo (tela) no ponto médio
+ACTIVE_EDGE_REACH = 4
+WEIGHT_LABEL_REACH = 24
+# Até quantos nós o atlas pré-renderiza os sprites ao trocar de grafo
+ATLAS_PREBUILD_MAX = 200
+
+# Visualizador de BFS/DFS: tempo máximo por frame para aplicar e pintar
+# passos (ms) e velocidades em passos/s (None = o quanto couber no orçamento)
+VISUALIZER_BUDGET_MS = 6
+VISUALIZER_SPEEDS = [1, 2, 5, 10, 30, 100, 1000, None]
+VISUALIZER_DEFAULT_SPEED = 2
+
+# Limite de memória do cache de textos renderizados (bytes)
+TEXT_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+class TextCache:
+    """Cache central de fontes e textos renderizados.
+
+    Fontes são carregadas uma única vez por tamanho. Superfícies de texto
+    ficam num LRU indexado por (texto, tamanho, cor) com limite de memória.
+    """
+    def __init__(self, max_bytes=TEXT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text, size, color):
+        key = (text, size, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.get_font(size).render(text, True, color)
+        nbytes = surface.get_width() * surface.get_height() * surface.get_bytesize()
+        self.surfaces[key] = surface
+        self.used_bytes += nbytes
+
+        # Descartar os menos usados até caber no limite
+        while self.used_bytes > self.max_bytes and len(self.surfaces) > 1:
+            _, old = self.surfaces.popitem(last=False)
+            self.used_bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+        return surface
+
+    def size(self, text, size):
+        """Dimensões do texto sem renderizar"""
+        return self.get_font(size).size(text)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.surfaces),
+            "bytes": self.used_bytes,
+            "fonts": len(self.fonts),
+        }
+
+text_cache = TextCache()
+
+class Camera:
+    """Transformação mundo -> tela com pan e zoom.
+
+    (x, y) é o ponto do mundo no canto superior esquerdo da tela. Com zoom
+    1 e deslocamento zero a câmera é a identidade e o desenho é idêntico ao
+    de coordenadas fixas.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.x = 0
+        self.y = 0
+        self.level = 0
+        self.zoom = 1.0
+        self.graph = None
+
+    @property
+    def key(self):
+        return (self.x, self.y, self.level)
+
+    @property
+    def is_identity(self):
+        return self.level == 0 and self.x == 0 and self.y == 0
+
+    def to_screen(self, x, y):
+        return (int((x - self.x) * self.zoom), int((y - self.y) * self.zoom))
+
+    def to_world(self, sx, sy):
+        return (sx / self.zoom + self.x, sy / self.zoom + self.y)
+
+    def viewport(self, margin=0):
+        """Retângulo do mundo visível (x0, y0, x1, y1), com margem em pixels do mundo"""
+        return (self.x - margin, self.y - margin,
+                self.x + self.width / self.zoom + margin,
+                self.y + self.height / self.zoom + margin)
+
+    def set_level(self, level, sx, sy):
+        """Muda o nível de zoom mantendo fixo o ponto do mundo sob (sx, sy)"""
+        level = max(ZOOM_MIN_LEVEL, min(ZOOM_MAX_LEVEL, level))
+        wx, wy = self.to_world(sx, sy)
+        self.level = level
+        self.zoom = ZOOM_STEP ** level
+        self.x = round(wx - sx / self.zoom)
+        self.y = round(wy - sy / self.zoom)
+
+    def zoom_at(self, sx, sy, steps):
+        self.set_level(self.level + steps, sx, sy)
+
+    def pan(self, dx, dy):
+        """Arrasta a vista por (dx, dy) pixels de tela"""
+        self.x = round(self.x - dx / self.zoom)
+        self.y = round(self.y - dy / self.zoom)
+
+    def fit(self, graph):
+        """Identidade se o grafo cabe na tela; senão, zoom para enquadrá-lo"""
+        self.graph = graph
+        self.x = self.y = 0
+        self.level = 0
+        self.zoom = 1.0
+        bounds = graph.bounds()
+        if bounds is None:
+            return
+        x0, y0, x1, y1 = bounds
+        if x0 >= 0 and y0 >= 0 and x1 <= self.width and y1 <= self.height:
+            return
+        fit_zoom = min(self.width / max(1, x1 - x0), self.height / max(1, y1 - y0))
+        self.level = max(ZOOM_MIN_LEVEL, min(0, math.floor(math.log(fit_zoom, ZOOM_STEP))))
+        self.zoom = ZOOM_STEP ** self.level
+        self.x = round((x0 + x1) / 2 - self.width / 2 / self.zoom)
+        self.y = round((y0 + y1) / 2 - self.height / 2 / self.zoom)
+
+    def follow(self, graph):
+        """Enquadra o grafo só quando ele muda"""
+        if graph is not self.graph:
+            self.fit(graph)
+
+class Compositor:
+    """Compositor em camadas para as telas de jogo.
+
+    O fundo (cor + grade) é renderizado uma única vez. A camada do grafo
+    estático é reconstruída apenas quando a estrutura do grafo muda; a
+    cada frame só o caminho do jogador, seleção e brilho são desenhados.
+    Menus e introduções são guardados inteiros, um por estado, e os fundos
+    translúcidos dos painéis, um por tamanho e estilo.
+    """
+    def __init__(self, width, height):
+        self.size = (width, height)
+        self.background = self.build_background()
+        self.graph_layer = None
+        self.graph_key = None
+        self.rebuilds = 0
+        self.screens = {}
+        self.panels = {}
+
+    def build_background(self):
+        surface = pygame.Surface(self.size).convert()
+        surface.fill(COLOR_BG)
+        width, height = self.size
+        for x in range(0, width, 60):
+            pygame.draw.line(surface, COLOR_GRID, (x, 0), (x, height), 2)
+        for y in range(0, height, 60):
+            pygame.draw.line(surface, COLOR_GRID, (0, y), (width, y), 2)
+        return surface
+
+    def draw_background(self, screen):
+        screen.blit(self.background, (0, 0))
+
+    def draw_static_graph(self, screen, graph, camera=None, overlay=None):
+        """Fundo + grafo estático; `overlay` (paint_all/paint_pending) pinta por cima"""
+        key = (graph, graph.version, graph.start_node, camera.key if camera else None, overlay)
+        if self.graph_layer is None or key != self.graph_key:
+            node_atlas.build(graph)
+            if self.graph_layer is None:
+                self.graph_layer = self.background.copy()
+            else:
+                self.graph_layer.blit(self.background, (0, 0))
+            draw_graph_static(self.graph_layer, graph, camera)
+            if overlay is not None:
+                overlay.paint_all(self.graph_layer, camera)
+            self.graph_key = key
+            self.rebuilds += 1
+        elif overlay is not None and overlay.pending:
+            overlay.paint_pending(self.graph_layer, camera)
+        screen.blit(self.graph_layer, (0, 0))
+
+    def panel(self, size, fill, border=None, radius=10):
+        """Fundo translúcido de painel (cor `fill` RGBA, contorno opcional) em cache"""
+        key = (size, fill, border, radius)
+        surface = self.panels.get(key)
+        if surface is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(surface, fill, surface.get_rect(), border_radius=radius)
+            if border is not None:
+                pygame.draw.rect(surface, border, surface.get_rect(), 3, border_radius=radius)
+            self.panels[key] = surface
+        return surface
+
+    def static_screen(self, key, render):
+        """Tela estática em cache; render(surface, key) a desenha na primeira vez"""
+        surface = self.screens.get(key)
+        if surface is None:
+            surface = pygame.Surface(self.size).convert()
+            render(surface, key)
+            self.screens[key] = surface
+        return surface
+
+class RenderScheduler:
+    """Agenda redesenhos apenas quando algo mudou.
+
+    O frame é marcado como sujo por entrada, troca de estado ou animação.
+    Sem nada pendente, o loop bloqueia em pygame.event.wait com timeout em
+    vez de redesenhar continuamente.
+    """
+    def __init__(self, clock, animation_fps=FPS, idle_fps=IDLE_FPS,
+                 idle_timeout_ms=IDLE_TIMEOUT_MS):
+        self.clock = clock
+        self.animation_fps = animation_fps
+        self.idle_fps = idle_fps
+        self.idle_timeout_ms = idle_timeout_ms
+        self.dirty = True
+        self.animating = False
+        self.frames_drawn = 0
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def set_animating(self, animating):
+        self.animating = animating
+        if animating:
+            self.dirty = True
+
+    def poll_events(self):
+        """Retorna os eventos pendentes, bloqueando se estiver ocioso"""
+        if self.dirty or self.animating:
+            return pygame.event.get()
+        event = pygame.event.wait(self.idle_timeout_ms)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def should_draw(self):
+        return self.dirty or self.animating
+
+    def frame_done(self):
+        self.dirty = False
+        self.frames_drawn += 1
+        self.clock.tick(self.animation_fps if self.animating else self.idle_fps)
+
+# Quantos frames o medidor de desempenho guarda (janela deslizante)
+PROFILER_HISTORY = 300
+
+class FrameProfiler:
+    """Tempos por frame e latência de clique, com overlay (F3) e CSV (F4).
+
+    Cada frame é dividido em eventos, desenho, flip e espera do clock.
+    A latência de clique vai do MOUSEBUTTONDOWN recebido até o flip que
+    mostra o resultado de handle_node_click.
+    """
+    def __init__(self, history=PROFILER_HISTORY):
+        self.frames = deque(maxlen=history)
+        self.latencies = deque(maxlen=history)
+        self.visible = False
+        self.current = {}
+        self.events_received_at = None
+        self.click_started = None
+        self.last_export = None
+
+    def begin_frame(self):
+        self.current = {"events_ms": 0.0, "draw_ms": 0.0, "flip_ms": 0.0,
+                        "wait_ms": 0.0, "latency_ms": None}
+        self.events_received_at = time.perf_counter()
+
+    def record(self, phase, seconds):
+        self.current[phase] = seconds * 1000
+
+    def begin_click(self):
+        """Marca um clique em nó, a ser fechado no próximo flip"""
+        if self.click_started is None:
+            self.click_started = self.events_received_at or time.perf_counter()
+
+    def flipped(self, at):
+        if self.click_started is not None:
+            latency = (at - self.click_started) * 1000
+            self.latencies.append(latency)
+            self.current["latency_ms"] = latency
+            self.click_started = None
+
+    def end_frame(self):
+        frame = self.current
+        frame["total_ms"] = (frame["events_ms"] + frame["draw_ms"] +
+                             frame["flip_ms"] + frame["wait_ms"])
+        self.frames.append(frame)
+
+    def percentiles(self, values, fractions=(0.5, 0.95, 0.99)):
+        ordered = sorted(values)
+        if not ordered:
+            return [0.0 for _ in fractions]
+        return [ordered[min(len(ordered) - 1, int(f * len(ordered)))] for f in fractions]
+
+    def fps(self):
+        total = sum(frame["total_ms"] for frame in self.frames)
+        return 1000 * len(self.frames) / total if total > 0 else 0.0
+
+    def export_csv(self, path=None):
+        if path is None:
+            path = time.strftime("frame_times_%Y%m%d_%H%M%S.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "events_ms", "draw_ms", "flip_ms", "wait_ms",
+                             "total_ms", "click_latency_ms"])
+            for i, frame in enumerate(self.frames):
+                latency = frame["latency_ms"]
+                writer.writerow([i] + [f"{frame[k]:.3f}" for k in
+                                       ("events_ms", "draw_ms", "flip_ms", "wait_ms", "total_ms")] +
+                                [f"{latency:.3f}" if latency is not None else ""])
+        self.last_export = path
+        return path
+
+    def draw_hud(self, screen, x=20, y=20, width=460, height=250):
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.rect(panel, (0, 0, 0, 200), panel.get_rect(), border_radius=10)
+        screen.blit(panel, (x, y))
+
+        frames = list(self.frames)
+        last = frames[-1] if frames else {"events_ms": 0, "draw_ms": 0, "flip_ms": 0, "wait_ms": 0}
+        p50, p95, p99 = self.percentiles([frame["total_ms"] for frame in frames])
+        l50, l95, _ = self.percentiles(self.latencies)
+        lines = [
+            f"FPS {self.fps():5.1f}   frame p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f} ms",
+            f"eventos {last['events_ms']:.2f}  desenho {last['draw_ms']:.2f}  "
+            f"flip {last['flip_ms']:.2f}  espera {last['wait_ms']:.2f} ms",
+            f"latência clique p50 {l50:.1f}  p95 {l95:.1f} ms ({len(self.latencies)})",
+            "F4: exportar CSV" + (f"  -> {self.last_export}" if self.last_export else ""),
+        ]
+        # Fonte direta: números mudam a cada frame e poluiriam o cache de textos
+        font = text_cache.get_font(22)
+        for i, line in enumerate(lines):
+            screen.blit(font.render(line, True, COLOR_TEXT), (x + 12, y + 10 + i * 22))
+
+        # Gráfico dos últimos frames, com referência de 16,7 ms (60 FPS)
+        graph_top = y + 110
+        graph_height = height - 125
+        scale = graph_height / 50.0
+        budget_y = graph_top + graph_height - int(16.7 * scale)
+        pygame.draw.line(screen, COLOR_ERROR, (x + 10, budget_y), (x + width - 10, budget_y), 1)
+        recent = frames[-(width - 20):]
+        if len(recent) > 1:
+            points = [(x + 10 + i, graph_top + graph_height - int(min(50, f["total_ms"]) * scale))
+                      for i, f in enumerate(recent)]
+            pygame.draw.lines(screen, COLOR_SUCCESS, False, points, 1)
+
+# Número de níveis de transparência pré-renderizados para o brilho
+GLOW_LEVELS = 16
+
+class NodeAtlas:
+    """Atlas de sprites pré-renderizados dos nós.
+
+    Cada combinação (ID, cor, borda) é desenhada uma única vez com
+    convert_alpha(); desenhar um nó passa a ser um único blit. O brilho
+    usa um conjunto fixo de níveis de transparência em cache.
+    """
+    def __init__(self):
+        self.sprites = {}
+        self.scaled = {}
+        self.glows = {}
+        self.graph = None
+
+    def build(self, graph):
+        """Pré-renderiza os estados de todos os nós de um novo grafo (se pequeno)"""
+        if graph is self.graph:
+            return
+        self.graph = graph
+        self.sprites.clear()
+        self.scaled.clear()
+        if len(graph.nodes) > ATLAS_PREBUILD_MAX:
+            return
+        for node in graph.nodes:
+            if node == graph.start_node:
+                colors = [COLOR_NODE_START]
+            elif node.is_target:
+                colors = [COLOR_NODE_TARGET]
+            else:
+                colors = [COLOR_NODE, COLOR_EDGE_PLAYER, COLOR_NODE_HOVER]
+            for color in colors:
+                self.get_sprite(node, color, 3)
+
+    def get_sprite(self, node, color, border_width):
+        key = (node.id, color, border_width, node.radius)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.render_sprite(node, color, border_width)
+            self.sprites[key] = sprite
+        return sprite
+
+    def get_scaled_sprite(self, node, color, border_width, size):
+        """Sprite reduzido/ampliado para um nível de zoom (um tamanho por nível)"""
+        key = (node.id, color, border_width, node.radius, size)
+        sprite = self.scaled.get(key)
+        if sprite is None:
+            base = self.get_sprite(node, color, border_width)
+            sprite = pygame.transform.smoothscale(base, (size, size))
+            self.scaled[key] = sprite
+        return sprite
+
+    def render_sprite(self, node, color, border_width):
+        radius = node.radius
+        center = (radius + 1, radius + 1)
+        sprite = pygame.Surface((radius * 2 + 2, radius * 2 + 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, color, center, radius)
+        pygame.draw.circle(sprite, (255, 255, 255), center, radius, border_width)
+        text = text_cache.render(str(node.id), 36, (0, 0, 0))
+        sprite.blit(text, text.get_rect(center=center))
+        return sprite.convert_alpha()
+
+    def get_glow(self, radius, alpha):
+        level = min(GLOW_LEVELS - 1, int(alpha) * GLOW_LEVELS // 256)
+        key = (radius, level)
+        surface = self.glows.get(key)
+        if surface is None:
+            level_alpha = (level + 1) * 256 // GLOW_LEVELS - 1
+            surface = pygame.Surface((radius * 4, radius * 4), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (*COLOR_NODE[:3], level_alpha),
+                               (radius * 2, radius * 2), radius * 2)
+            surface = surface.convert_alpha()
+            self.glows[key] = surface
+        return surface
+
+node_atlas = NodeAtlas()
 
 class GameState(Enum):
     MAIN_MENU = 0
@@ -47,74 +512,98 @@ class GameState(Enum):
     PHASE_2_INTRO = 5
     PHASE_2_PLAY = 6
     VICTORY = 7
+    PHASE_3_INTRO = 8
+    PHASE_3_PLAY = 9
 
-class Node:
-    def __init__(self, id, x, y, is_target=False):
-        self.id = id
-        self.x = x
-        self.y = y
-        self.is_target = is_target
-        self.visited = False
-        self.in_path = False
-        self.neighbors = []
-        self.radius = 35
-        self.glow = 0
-        self.selected = False
-        
-    def draw(self, screen, is_start=False):
-        # Efeito de brilho
-        if self.glow > 0:
-            glow_surface = pygame.Surface((self.radius * 4, self.radius * 4), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surface, (*COLOR_NODE[:3], int(self.glow)), 
-                             (self.radius * 2, self.radius * 2), self.radius * 2)
-            screen.blit(glow_surface, (self.x - self.radius * 2, self.y - self.radius * 2))
-            self.glow = max(0, self.glow - 5)
-        
-        # Cor do nó
-        if is_start:
-            color = COLOR_NODE_START
-        elif self.is_target:
-            color = COLOR_NODE_TARGET
-        elif self.in_path:
-            color = COLOR_EDGE_PLAYER
-        elif self.selected:
-            color = COLOR_NODE_HOVER
-        else:
-            color = COLOR_NODE
-        
-        # Desenhar nó
-        pygame.draw.circle(screen, color, (int(self.x), int(self.y)), self.radius)
-        
-        # Borda mais grossa se selecionado
-        border_width = 6 if self.selected else 3
-        pygame.draw.circle(screen, (255, 255, 255), (int(self.x), int(self.y)), self.radius, border_width)
-        
-        # Desenhar ID
-        font = pygame.font.Font(None, 36)
-        text = font.render(str(self.id), True, (0, 0, 0))
-        text_rect = text.get_rect(center=(int(self.x), int(self.y)))
-        screen.blit(text, text_rect)
+# Telas sem grafo: renderizadas uma vez e mantidas em cache pelo Compositor
+STATIC_SCREENS = (GameState.MAIN_MENU, GameState.TUTORIAL_INTRO, GameState.PHASE_1_INTRO,
+                  GameState.PHASE_2_INTRO, GameState.PHASE_3_INTRO, GameState.VICTORY)
+# Fases com grafo aleatório e, com o tutorial, todas as telas jogáveis
+PHASE_PLAY_STATES = (GameState.PHASE_1_PLAY, GameState.PHASE_2_PLAY, GameState.PHASE_3_PLAY)
+PLAY_STATES = (GameState.TUTORIAL_PLAY,) + PHASE_PLAY_STATES
+
+def draw_node(screen, node, is_start=False, static=False, camera=None):
+    """Desenha um nó; com static=True ignora caminho, seleção e brilho"""
+    if camera is not None and not camera.is_identity:
+        x, y = camera.to_screen(node.x, node.y)
+        radius = max(2, int(node.radius * camera.zoom))
+    else:
+        camera = None
+        x, y = node.x, node.y
+        radius = node.radius
+    
+    # Efeito de brilho
+    if node.glow > 0 and not static:
+        glow_surface = node_atlas.get_glow(radius, node.glow)
+        screen.blit(glow_surface, (x - radius * 2, y - radius * 2))
+        node.glow = max(0, node.glow - 5)
+    
+    # Cor do nó
+    if is_start:
+        color = COLOR_NODE_START
+    elif node.is_target:
+        color = COLOR_NODE_TARGET
+    elif node.in_path and not static:
+        color = COLOR_EDGE_PLAYER
+    elif (node.selected or node.hovered) and not static:
+        color = COLOR_NODE_HOVER
+    else:
+        color = COLOR_NODE
     
-    def contains_point(self, x, y):
-        dist = math.sqrt((self.x - x) ** 2 + (self.y - y) ** 2)
-        return dist <= self.radius
+    # Borda mais grossa se selecionado
+    border_width = 6 if node.selected and not static else 3
+    blit_node(screen, node, color, border_width, camera)
 
-class Edge:
-    def __init__(self, node1, node2):
-        self.node1 = node1
-        self.node2 = node2
-        self.player_selected = False
-        
-    def draw(self, screen):
-        if self.player_selected:
-            color = COLOR_EDGE_PLAYER
-            width = 7
-        else:
-            color = COLOR_EDGE
-            width = 3
-        pygame.draw.line(screen, color, 
-                        (int(self.node1.x), int(self.node1.y)),
-                        (int(self.node2.x), int(self.node2.y)), width)
+def blit_node(screen, node, color, border_width, camera=None):
+    """Sprite do nó com a cor e borda dadas, na escala da câmera"""
+    if camera is None or camera.is_identity:
+        # Nó completo (círculo, borda e ID) vem pronto do atlas
+        sprite = node_atlas.get_sprite(node, color, border_width)
+        offset = node.radius + 1
+        screen.blit(sprite, (int(node.x) - offset, int(node.y) - offset))
+        return
+    x, y = camera.to_screen(node.x, node.y)
+    radius = max(2, int(node.radius * camera.zoom))
+    if camera.zoom < LOD_ZOOM:
+        # Afastado: só o círculo, sem borda nem rótulo
+        pygame.draw.circle(screen, color, (x, y), radius)
+    else:
+        sprite = node_atlas.get_scaled_sprite(node, color, border_width, radius * 2 + 2)
+        screen.blit(sprite, (x - radius - 1, y - radius - 1))
+
+def draw_edge(screen, edge, static=False, camera=None):
+    if edge.player_selected and not static:
+        color = COLOR_EDGE_PLAYER
+        width = 7
+    else:
+        color = COLOR_EDGE
+        width = 3
+    draw_segment(screen, edge.node1, edge.node2, color, width, camera)
+
+def draw_edge_weight(screen, edge, camera=None):
+    """Custo da aresta no ponto médio (omitido quando afastado)"""
+    if camera is not None and not camera.is_identity:
+        if camera.zoom < LOD_ZOOM:
+            return
+        x1, y1 = camera.to_screen(edge.node1.x, edge.node1.y)
+        x2, y2 = camera.to_screen(edge.node2.x, edge.node2.y)
+    else:
+        x1, y1, x2, y2 = edge.node1.x, edge.node1.y, edge.node2.x, edge.node2.y
+    label = text_cache.render(str(edge.weight), 24, COLOR_EDGE_WEIGHT)
+    rect = label.get_rect(center=((x1 + x2) // 2, (y1 + y2) // 2))
+    pygame.draw.rect(screen, COLOR_BG, rect.inflate(8, 2), border_radius=4)
+    screen.blit(label, rect)
+
+def draw_segment(screen, node1, node2, color, width, camera=None):
+    """Linha entre dois nós; afastada, vira traço fino"""
+    if camera is not None and not camera.is_identity:
+        width = 1 if camera.zoom < LOD_ZOOM else max(1, int(width * camera.zoom))
+        pygame.draw.line(screen, color, camera.to_screen(node1.x, node1.y),
+                         camera.to_screen(node2.x, node2.y), width)
+        return
+    pygame.draw.line(screen, color, 
+                    (int(node1.x), int(node1.y)),
+                    (int(node2.x), int(node2.y)), width)
 
 class Button:
     def __init__(self, x, y, width, height, text, action=None):
@@ -122,205 +611,419 @@ class Button:
         self.text = text
         self.action = action
         self.hovered = False
+        self.font_size = self.fit_font_size()
         
-    def draw(self, screen):
-        color = COLOR_BUTTON_HOVER if self.hovered else COLOR_BUTTON
-        pygame.draw.rect(screen, color, self.rect, border_radius=12)
-        pygame.draw.rect(screen, COLOR_NODE, self.rect, 4, border_radius=12)
-        
+    def fit_font_size(self):
+        """Calcula uma única vez o tamanho de fonte que cabe no botão"""
         # Ajustar tamanho da fonte baseado no comprimento do texto
         font_size = 36
         if len(self.text) > 15:
             font_size = 30
         elif len(self.text) > 12:
             font_size = 32
-            
-        font = pygame.font.Font(None, font_size)
-        text_surface = font.render(self.text, True, COLOR_TEXT)
         
         # Verificar se o texto cabe no botão
-        text_width, text_height = text_surface.get_size()
+        text_width, text_height = text_cache.size(self.text, font_size)
         max_width = self.rect.width - 20  # Margem de 10 pixels em cada lado
-        max_height = self.rect.height - 10  # Margem de 5 pixels em cada lado
         
         if text_width > max_width:
             # Reduzir fonte se necessário
             font_size = int(font_size * (max_width / text_width))
-            font = pygame.font.Font(None, font_size)
-            text_surface = font.render(self.text, True, COLOR_TEXT)
+        return font_size
+        
+    def draw(self, screen):
+        color = COLOR_BUTTON_HOVER if self.hovered else COLOR_BUTTON
+        pygame.draw.rect(screen, color, self.rect, border_radius=12)
+        pygame.draw.rect(screen, COLOR_NODE, self.rect, 4, border_radius=12)
         
+        text_surface = text_cache.render(self.text, self.font_size, COLOR_TEXT)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
-        
-    def handle_event(self, event):
+
+def coalesce_motion(events):
+    """Funde os MOUSEMOTION do frame num só: última posição, deslocamento somado.
+    
+    O evento fundido fica no lugar do último movimento, preservando a ordem
+    em relação a cliques e teclas.
+    """
+    last = None
+    count = 0
+    rel_x = rel_y = 0
+    for i, event in enumerate(events):
         if event.type == pygame.MOUSEMOTION:
-            self.hovered = self.rect.collidepoint(event.pos)
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if self.hovered and self.action:
-                self.action()
-                return True
-        return False
-
-class Graph:
+            last = i
+            count += 1
+            rel_x += event.rel[0]
+            rel_y += event.rel[1]
+    if count <= 1:
+        return events
+    merged = pygame.event.Event(pygame.MOUSEMOTION, pos=events[last].pos, rel=(rel_x, rel_y),
+                                buttons=events[last].buttons)
+    return [merged if i == last else event for i, event in enumerate(events)
+            if event.type != pygame.MOUSEMOTION or i == last]
+
+class InputDispatcher:
+    """Teste de região para o mouse: camada de botões antes do grafo.
+    
+    Só o botão sob o cursor e o que estava em hover são atualizados; um
+    clique é entregue ao primeiro alvo que o trata e para ali.
+    """
     def __init__(self):
-        self.nodes = []
-        self.edges = []
-        self.start_node = None
-        self.target_node = None
-        
-    def add_node(self, node):
-        self.nodes.append(node)
-        if node.is_target:
-            self.target_node = node
-        
-    def add_edge(self, node1, node2):
-        edge = Edge(node1, node2)
-        self.edges.append(edge)
-        node1.neighbors.append(node2)
-        node2.neighbors.append(node1)
-        
+        self.hovered_button = None
+        # Botões cujo hover mudou desde o último take_changed()
+        self.changed_buttons = []
+
     def reset(self):
-        for node in self.nodes:
-            node.visited = False
-            node.in_path = False
-            node.selected = False
-        for edge in self.edges:
-            edge.player_selected = False
-            
-    def draw(self, screen):
-        # Desenhar arestas primeiro
-        for edge in self.edges:
-            edge.draw(screen)
-        
-        # Desenhar nós
-        for node in self.nodes:
-            is_start = (node == self.start_node)
-            node.draw(screen, is_start)
-
-def generate_random_graph(num_nodes=12, min_x=250, max_x=1670, min_y=250, max_y=750):
-    """Gera um grafo aleatório conectado com múltiplos caminhos"""
-    graph = Graph()
-    nodes = []
+        self.hovered_button = None
+        self.changed_buttons = []
+
+    def take_changed(self):
+        """Botões a repintar (hover mudou) desde a última chamada"""
+        changed, self.changed_buttons = self.changed_buttons, []
+        return changed
+
+    def button_at(self, buttons, pos):
+        # Último desenhado fica por cima
+        for button in reversed(buttons):
+            if button.rect.collidepoint(pos):
+                return button
+        return None
+
+    def hover(self, buttons, pos):
+        """Atualiza o hover dos botões; retorna (botão sob o cursor, mudou?)"""
+        button = self.button_at(buttons, pos)
+        old = self.hovered_button
+        if button is old:
+            return button, False
+        if old is not None:
+            old.hovered = False
+            self.changed_buttons.append(old)
+        if button is not None:
+            button.hovered = True
+            self.changed_buttons.append(button)
+        self.hovered_button = button
+        return button, True
+
+    def click(self, buttons, pos):
+        """Aciona o botão sob o clique; retorna True se algum tratou o clique"""
+        button = self.button_at(buttons, pos)
+        if button is None or button.action is None:
+            return button is not None
+        button.action()
+        return True
+
+def visible_elements(graph, camera):
+    """Arestas e nós que aparecem na vista da câmera (todos, sem câmera)"""
+    if camera is None or camera.is_identity:
+        return graph.edges, graph.nodes
+    return (graph.edges_in_rect(*camera.viewport()),
+            graph.spatial.query_rect(*camera.viewport(NODE_RADIUS_MARGIN)))
+
+def edge_in_view(edge, view):
+    a, b = edge.node1, edge.node2
+    return (min(a.x, b.x) <= view[2] and max(a.x, b.x) >= view[0] and
+            min(a.y, b.y) <= view[3] and max(a.y, b.y) >= view[1])
+
+def draw_graph_static(screen, graph, camera=None):
+    """Desenha o grafo no estado padrão (camada estática), recortado pela câmera"""
+    edges, nodes = visible_elements(graph, camera)
+    for edge in edges:
+        draw_edge(screen, edge, static=True, camera=camera)
+    if graph.weighted:
+        for edge in edges:
+            draw_edge_weight(screen, edge, camera)
+    for node in nodes:
+        draw_node(screen, node, node == graph.start_node, static=True, camera=camera)
+
+def nodes_under_segment(graph, a, b, reach):
+    """Nós cujo círculo fica a até `reach` do segmento a-b"""
+    pad = graph.spatial.max_radius + reach
+    dx, dy = b.x - a.x, b.y - a.y
+    length2 = dx * dx + dy * dy or 1
+    found = []
+    for node in graph.spatial.query_rect(min(a.x, b.x) - pad, min(a.y, b.y) - pad,
+                                         max(a.x, b.x) + pad, max(a.y, b.y) + pad):
+        t = max(0, min(1, ((node.x - a.x) * dx + (node.y - a.y) * dy) / length2))
+        px, py = a.x + t * dx - node.x, a.y + t * dy - node.y
+        limit = node.radius + reach
+        if px * px + py * py <= limit * limit:
+            found.append(node)
+    return found
+
+def draw_graph_dynamic(screen, graph, camera=None):
+    """Desenha apenas o que mudou sobre a camada estática"""
+    if camera is not None and camera.is_identity:
+        camera = None
+    view = camera.viewport(NODE_RADIUS_MARGIN) if camera is not None else None
     
-    # Criar nós com posições aleatórias
-    for i in range(num_nodes):
-        attempts = 0
-        while attempts < 50:
-            x = random.randint(min_x, max_x)
-            y = random.randint(min_y, max_y)
-            
-            # Verificar distância mínima de outros nós
-            valid = True
-            for node in nodes:
-                dist = math.sqrt((node.x - x) ** 2 + (node.y - y) ** 2)
-                if dist < 120:  # Aumentada distância mínima
-                    valid = False
-                    break
-            
-            if valid:
-                break
-            attempts += 1
-        
-        is_target = (i == num_nodes - 1)
-        node = Node(i + 1, x, y, is_target)
-        nodes.append(node)
-        graph.add_node(node)
+    nodes = set(graph.active_nodes)
+    for edge in graph.active_edges:
+        nodes.add(edge.node1)
+        nodes.add(edge.node2)
     
-    # Primeiro nó é o inicial
-    graph.start_node = nodes[0]
+    reach = ACTIVE_EDGE_REACH
+    if graph.weighted and (camera is None or camera.zoom >= LOD_ZOOM):
+        reach = max(reach, WEIGHT_LABEL_REACH / (camera.zoom if camera is not None else 1))
+    covered = set()
+    for edge in graph.active_edges:
+        if view is None or edge_in_view(edge, view):
+            draw_edge(screen, edge, camera=camera)
+            if graph.weighted:
+                draw_edge_weight(screen, edge, camera)
+            covered.update(nodes_under_segment(graph, edge.node1, edge.node2, reach))
     
-    # FASE 1: Criar árvore geradora mínima
-    connected = [nodes[0]]
-    unconnected = nodes[1:]
+    # Nós estáticos cruzados por uma aresta do caminho voltam a ficar por cima
+    for node in covered - nodes:
+        draw_node(screen, node, node == graph.start_node, static=True, camera=camera)
     
-    tree_edges = []
+    for node in nodes:
+        if view is None or (view[0] <= node.x <= view[2] and view[1] <= node.y <= view[3]):
+            draw_node(screen, node, node == graph.start_node, camera=camera)
+
+class AlgorithmVisualizer:
+    """Executa BFS/DFS passo a passo a partir dos geradores do núcleo.
     
-    while unconnected:
-        best_pair = None
-        best_distance = float('inf')
-        
-        for uc in unconnected:
-            for c in connected:
-                dist = math.sqrt((uc.x - c.x)**2 + (uc.y - c.y)**2)
-                if dist < best_distance:
-                    best_distance = dist
-                    best_pair = (c, uc)
-        
-        if best_pair:
-            node1, node2 = best_pair
-            graph.add_edge(node1, node2)
-            tree_edges.append((node1, node2))
-            connected.append(node2)
-            unconnected.remove(node2)
+    Cada frame aplica os passos devidos pela velocidade, limitados a
+    VISUALIZER_BUDGET_MS (contando o custo estimado de pintá-los), então
+    nenhum frame roda a travessia inteira. As mudanças são pintadas de forma
+    incremental sobre a camada estática do Compositor (paint_pending);
+    paint_all a repinta quando ela é refeita.
+    """
+    FRONTIER = 0
+    DONE = 1
     
-    # FASE 2: Adicionar arestas extras
-    target_node = nodes[-1]
-    potential_target_connections = []
+    def __init__(self, graph, algorithm="BFS"):
+        self.graph = graph
+        self.algorithm = algorithm
+        self.steps = bfs_steps(graph) if algorithm == "BFS" else dfs_steps(graph)
+        self.states = {}
+        self.parent = {}
+        self.current = None
+        self.path = None
+        self.path_set = set()
+        self.step_count = 0
+        self.frontier_size = 0
+        self.pending = []
+        self.playing = True
+        self.finished = False
+        self.speed_index = VISUALIZER_DEFAULT_SPEED
+        self.credit = 0.0
+        self.last_update = None
+        # Custo médio (s) de pintar um item pendente, medido em paint_pending
+        # (começa com uma estimativa de um blit de sprite)
+        self.paint_cost = 0.00002
     
-    for node in nodes[:-1]:
-        if node not in target_node.neighbors:
-            dist = math.sqrt((node.x - target_node.x)**2 + (node.y - target_node.y)**2)
-            if dist < 500:
-                potential_target_connections.append((node, dist))
+    @property
+    def speed(self):
+        return VISUALIZER_SPEEDS[self.speed_index]
     
-    potential_target_connections.sort(key=lambda x: x[1])
-    num_target_edges = min(4, len(potential_target_connections))
+    def toggle(self):
+        self.playing = not self.playing and not self.finished
+        self.last_update = None
     
-    for i in range(num_target_edges):
-        if i < len(potential_target_connections):
-            node = potential_target_connections[i][0]
-            if node not in target_node.neighbors:
-                graph.add_edge(node, target_node)
+    def change_speed(self, delta):
+        self.speed_index = max(0, min(len(VISUALIZER_SPEEDS) - 1, self.speed_index + delta))
     
-    # Adicionar mais arestas para conectar o grafo
-    num_extra_edges = random.randint(num_nodes * 2, num_nodes * 3)
+    def step(self):
+        """Aplica um passo; retorna False quando a travessia acabou"""
+        if self.finished:
+            return False
+        step = next(self.steps, None)
+        if step is None:
+            self.finish(None)
+            return False
+        self.step_count += 1
+        node = step.node
+        event = step.event
+        if event in (TraversalEvent.ENQUEUE, TraversalEvent.PUSH):
+            self.states[node] = self.FRONTIER
+            self.frontier_size += 1
+            if step.parent is not None:
+                self.parent[node] = step.parent
+                self.pending.append(("edge", node))
+            if event == TraversalEvent.PUSH:
+                self.set_current(node)
+        elif event in (TraversalEvent.DEQUEUE, TraversalEvent.POP):
+            self.states[node] = self.DONE
+            self.frontier_size -= 1
+            if event == TraversalEvent.DEQUEUE:
+                self.set_current(node)
+            else:
+                self.set_current(step.parent)
+        elif event == TraversalEvent.FOUND:
+            self.finish(node)
+            return False
+        self.pending.append(("node", node))
+        return True
     
-    for _ in range(num_extra_edges):
-        node1 = random.choice(nodes)
-        node2 = random.choice(nodes)
-        
-        if (node1 != node2 and 
-            node2 not in node1.neighbors and 
-            (node1, node2) not in tree_edges and 
-            (node2, node1) not in tree_edges):
-            
-            dist = math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
-            max_dist = 600 if num_nodes > 10 else 500
-            
-            if dist < max_dist:
-                prob = 0.7 - (dist / max_dist) * 0.4
-                if random.random() < prob:
-                    graph.add_edge(node1, node2)
+    def set_current(self, node):
+        old = self.current
+        self.current = node
+        if old is not None:
+            self.pending.append(("node", old))
+        if node is not None:
+            self.pending.append(("node", node))
     
-    # Garantir conectividade mínima
-    for node in nodes:
-        if node != graph.start_node and node != target_node:
-            if len(node.neighbors) < 2:
-                candidates = [n for n in nodes 
-                            if n != node and 
-                            n not in node.neighbors]
-                
-                if candidates:
-                    # Escolher o mais próximo
-                    candidates.sort(key=lambda n: math.sqrt((n.x - node.x)**2 + (n.y - node.y)**2))
-                    for candidate in candidates:
-                        if candidate not in node.neighbors:
-                            graph.add_edge(node, candidate)
-                            break
+    def finish(self, target):
+        self.finished = True
+        self.playing = False
+        if target is None:
+            return
+        path = [target]
+        while path[-1] in self.parent:
+            path.append(self.parent[path[-1]])
+        path.reverse()
+        self.path = path
+        self.path_set = set(path)
+        for node in path:
+            self.pending.append(("node", node))
+        self.pending.append(("path", None))
+    
+    def update(self, now=None):
+        """Avança conforme a velocidade; retorna True se algum passo foi aplicado"""
+        if not self.playing:
+            return False
+        now = time.perf_counter() if now is None else now
+        if self.last_update is None:
+            self.last_update = now
+            self.credit = 1.0
+        elif self.speed is not None:
+            self.credit += (now - self.last_update) * self.speed
+        self.last_update = now
+        
+        deadline = time.perf_counter() + VISUALIZER_BUDGET_MS / 1000.0
+        applied = 0
+        while self.speed is None or self.credit >= 1:
+            if not self.step():
+                break
+            applied += 1
+            if self.speed is not None:
+                self.credit -= 1
+            # Checa o relógio (mais a pintura que virá) a cada 32 passos
+            if applied % 32 == 0 and (time.perf_counter() +
+                                      len(self.pending) * self.paint_cost > deadline):
+                break
+        if self.speed is not None:
+            # Não acumula passos atrasados além do que cabe num frame
+            self.credit = min(self.credit, 1.0)
+        return applied > 0
+    
+    def node_color(self, node):
+        if node is self.graph.start_node:
+            return COLOR_NODE_START
+        if node.is_target:
+            return COLOR_NODE_TARGET
+        if node in self.path_set:
+            return COLOR_EDGE_PLAYER
+        if self.states.get(node) == self.FRONTIER:
+            return COLOR_EDGE_ACTIVE
+        return COLOR_NODE_VISITED
+    
+    def paint_node(self, surface, node, camera):
+        if node not in self.states:
+            return
+        border = 6 if node is self.current else 3
+        blit_node(surface, node, self.node_color(node), border, camera)
     
-    return graph
+    def repaint_nodes(self, surface, nodes, camera):
+        """Põe os nós de volta por cima das linhas que os cruzaram"""
+        for node in nodes:
+            if node in self.states:
+                self.paint_node(surface, node, camera)
+            else:
+                draw_node(surface, node, node is self.graph.start_node, static=True, camera=camera)
+    
+    def paint_tree_edge(self, surface, node, camera):
+        parent = self.parent[node]
+        draw_segment(surface, parent, node, COLOR_EDGE_ACTIVE, 5, camera)
+        # Inclui as duas pontas, que estão a distância zero do segmento
+        crossed = nodes_under_segment(self.graph, parent, node, ACTIVE_EDGE_REACH)
+        self.repaint_nodes(surface, crossed, camera)
+    
+    def paint_path(self, surface, camera):
+        crossed = set()
+        for a, b in zip(self.path, self.path[1:]):
+            draw_segment(surface, a, b, COLOR_EDGE_PLAYER, 7, camera)
+            crossed.update(nodes_under_segment(self.graph, a, b, ACTIVE_EDGE_REACH))
+        self.repaint_nodes(surface, crossed, camera)
+    
+    def paint_all(self, surface, camera):
+        """Repinta todo o progresso (camada estática recém-refeita)"""
+        self.pending.clear()
+        crossed = set(self.states)
+        for node, parent in self.parent.items():
+            draw_segment(surface, parent, node, COLOR_EDGE_ACTIVE, 5, camera)
+            crossed.update(nodes_under_segment(self.graph, parent, node, ACTIVE_EDGE_REACH))
+        self.repaint_nodes(surface, crossed, camera)
+        if self.path is not None:
+            self.paint_path(surface, camera)
+    
+    def paint_pending(self, surface, camera):
+        started = time.perf_counter()
+        count = len(self.pending)
+        for kind, node in self.pending:
+            if kind == "edge":
+                self.paint_tree_edge(surface, node, camera)
+            elif kind == "path":
+                self.paint_path(surface, camera)
+            else:
+                self.paint_node(surface, node, camera)
+        self.pending.clear()
+        cost = (time.perf_counter() - started) / count
+        self.paint_cost = 0.8 * self.paint_cost + 0.2 * cost
+    
+    def status(self):
+        speed = "máx" if self.speed is None else f"{self.speed}/s"
+        structure = "fila" if self.algorithm == "BFS" else "pilha"
+        if self.finished:
+            state = (f"alvo em {len(self.path) - 1} arestas" if self.path
+                     else "alvo inalcançável")
+        else:
+            state = "rodando" if self.playing else "pausado"
+        return (f"{self.algorithm} passo a passo — {state} · passos {self.step_count} · "
+                f"{structure} {self.frontier_size} · visitados {len(self.states)} · "
+                f"velocidade {speed}   [Espaço] play/pausa  [→] passo  [Cima/Baixo] velocidade")
 
 class CyberNexus:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    def __init__(self, bank_path=None, puzzle=None, graph_path=None,
+                 prefetch_depth=PREFETCH_DEPTH, num_nodes=12,
+                 scaled=False, vsync=False, seed=None):
+        # Inicialização do Pygame (fora do import, para o núcleo ser leve)
+        pygame.init()
+        self.init_display(scaled, vsync)
         pygame.display.set_caption("Cyber Nexus - Jogo Educacional de Grafos")
         self.clock = pygame.time.Clock()
+        self.compositor = Compositor(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.pan_button = None
+        self.input = InputDispatcher()
+        self.visualizer = None
+        self.scheduler = RenderScheduler(self.clock)
+        self.profiler = FrameProfiler()
         self.running = True
         
+        # Origem dos grafos das fases: arquivo fixo, banco de puzzles ou gerador
+        self.num_nodes = num_nodes
+        # Semente da sessão (None = aleatória): o k-ésimo grafo de cada fluxo
+        # usa derive_seed(seed, fluxo, k), independente do pré-carregamento
+        self.seed = seed
+        self.seed_counters = {}
+        self.graph_path = graph_path
+        self.puzzle_bank = PuzzleBank(bank_path) if bank_path else None
+        self.next_puzzle = puzzle
+        # Próximos grafos já preparados numa thread (0 = preparar na hora)
+        self.prefetch_depth = prefetch_depth
+        self.prefetcher = PuzzlePrefetcher(self.make_graph, prefetch_depth)
+        self.puzzle = None
+        
         self.state = GameState.MAIN_MENU
+        # Tela estática que já está na janela (permite redesenhar só os botões)
+        self.presented_screen = None
         self.graph = Graph()
         self.message = ""
         self.message_color = COLOR_TEXT
+        # Legenda das telas de jogo (fixa; montada no primeiro frame)
+        self.legend_panel = None
         
         # Controle de seleção de nós
         self.selected_node = None
@@ -330,12 +1033,34 @@ class CyberNexus:
         self.phase1_completed = False
         self.phase2_completed = False
         
+        # BFS x Dijkstra x A* no grafo da fase ponderada
+        self.search_stats = None
+        
         # Armazenar grafo atual para reutilização
         self.current_graph_state = None
         self.current_phase = None
         
         self.buttons = []
         self.setup_main_menu()
+        self.compositor.static_screen(self.state, self.render_static_screen)
+        
+    def init_display(self, scaled=False, vsync=False):
+        """Cria a janela; o jogo sempre desenha no espaço lógico 1920x1080.
+        
+        Com scaled/vsync a janela usa pygame.SCALED: o SDL ajusta 1920x1080 à
+        tela (ex.: notebooks 1366x768), escalando na GPU, e já entrega o mouse
+        em coordenadas lógicas.
+        """
+        flags = pygame.SCALED if (scaled or vsync) else 0
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags,
+                                              vsync=1 if vsync else 0)
+        
+    def present(self, rects=None):
+        """Envia o quadro para a janela (só os retângulos, se dados)"""
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
         
     def setup_main_menu(self):
         """Tela principal do jogo"""
@@ -344,15 +1069,29 @@ class CyberNexus:
                    lambda: self.change_state(GameState.TUTORIAL_INTRO)),
             Button(SCREEN_WIDTH//2 - 200, 520, 400, 80, "COMEÇAR A JOGAR", 
                    lambda: self.change_state(GameState.PHASE_1_INTRO)),
-            Button(SCREEN_WIDTH//2 - 200, 640, 400, 80, "SAIR", 
+            Button(SCREEN_WIDTH//2 - 200, 640, 400, 80, "FASE BÔNUS: DIJKSTRA",
+                   lambda: self.change_state(GameState.PHASE_3_INTRO)),
+            Button(SCREEN_WIDTH//2 - 200, 760, 400, 80, "SAIR", 
                    lambda: self.quit_game()),
         ]
         
     def change_state(self, new_state):
         self.state = new_state
+        self.scheduler.mark_dirty()
         self.message = ""
         self.selected_node = None
         self.player_path = []
+        self.pan_button = None
+        self.input.reset()
+        self.visualizer = None
+        
+        # A thread de pré-carregamento só roda nas fases com grafo aleatório
+        if new_state in [GameState.PHASE_1_INTRO, GameState.PHASE_1_PLAY,
+                         GameState.PHASE_2_INTRO, GameState.PHASE_2_PLAY]:
+            if self.prefetch_depth > 0:
+                self.prefetcher.start()
+        else:
+            self.prefetcher.cancel()
         
         if new_state == GameState.TUTORIAL_INTRO:
             self.setup_tutorial_intro()
@@ -366,10 +1105,18 @@ class CyberNexus:
             self.setup_phase_2_intro()
         elif new_state == GameState.PHASE_2_PLAY:
             self.setup_phase_2_play()
+        elif new_state == GameState.PHASE_3_INTRO:
+            self.setup_phase_3_intro()
+        elif new_state == GameState.PHASE_3_PLAY:
+            self.setup_phase_3_play()
         elif new_state == GameState.MAIN_MENU:
             self.setup_main_menu()
         elif new_state == GameState.VICTORY:
             self.setup_victory()
+        
+        # Aquece o cache já na troca, para o primeiro frame não engasgar
+        if new_state in STATIC_SCREENS:
+            self.compositor.static_screen(new_state, self.render_static_screen)
             
     def quit_game(self):
         self.running = False
@@ -403,6 +1150,7 @@ class CyberNexus:
         self.graph.add_edge(node3, node4)
         
         self.graph.start_node = node1
+        self.player_path = []
         
         self.buttons = [
             Button(100, 950, 300, 80, "RESETAR CAMINHO",
@@ -432,7 +1180,7 @@ class CyberNexus:
             self.graph = self.current_graph_state
             self.graph.reset()
         else:
-            self.graph = generate_random_graph(12)
+            self.use_puzzle(self.prefetcher.get())
             self.current_graph_state = self.graph
             self.current_phase = "phase1"
         
@@ -448,6 +1196,8 @@ class CyberNexus:
                    lambda: self.reset_current_path()),
             Button(690, 950, 250, 70, "NOVO GRAFO", 
                    lambda: self.new_graph()),
+            Button(970, 950, 280, 70, "ANIMAR BFS",
+                   lambda: self.start_visualizer("BFS")),
             Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU", 
                    lambda: self.change_state(GameState.MAIN_MENU)),
         ]
@@ -470,7 +1220,7 @@ class CyberNexus:
             self.graph = self.current_graph_state
             self.graph.reset()
         else:
-            self.graph = generate_random_graph(12)
+            self.use_puzzle(self.prefetcher.get())
             self.current_graph_state = self.graph
             self.current_phase = "phase2"
         
@@ -486,6 +1236,8 @@ class CyberNexus:
                    lambda: self.reset_current_path()),
             Button(690, 950, 250, 70, "NOVO GRAFO", 
                    lambda: self.new_graph()),
+            Button(970, 950, 280, 70, "ANIMAR DFS",
+                   lambda: self.start_visualizer("DFS")),
             Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU", 
                    lambda: self.change_state(GameState.MAIN_MENU)),
         ]
@@ -493,6 +1245,50 @@ class CyberNexus:
         if not self.message:
             self.message = "Clique nos nós para criar um caminho DFS do nó verde ao vermelho!"
         
+    def setup_phase_3_intro(self):
+        """Introdução da Fase Bônus - Dijkstra"""
+        self.buttons = [
+            Button(SCREEN_WIDTH//2 + 50, 850, 350, 80, "JOGAR FASE BÔNUS",
+                   lambda: self.change_state(GameState.PHASE_3_PLAY)),
+            Button(SCREEN_WIDTH//2 - 400, 850, 350, 80, "VOLTAR",
+                   lambda: self.change_state(GameState.MAIN_MENU)),
+        ]
+        
+    def setup_phase_3_play(self):
+        """Fase Bônus - caminho de custo mínimo num grafo ponderado"""
+        if self.current_phase == "phase3" and self.current_graph_state:
+            self.graph = self.current_graph_state
+            self.graph.reset()
+        else:
+            self.graph = self.make_weighted_graph()
+            self.puzzle = None
+            self.current_graph_state = self.graph
+            self.current_phase = "phase3"
+            # Árvore de caminhos mínimos pronta: verificar custa O(caminho)
+            self.graph.shortest_path_tree()
+            self.search_stats = compare_searches(self.graph)
+        
+        self.player_path = []
+        self.selected_node = None
+        
+        self.show_available_paths()
+        self.buttons = self.phase_3_buttons()
+        
+        if not self.message:
+            self.message = "Encontre o caminho de MENOR CUSTO do nó verde ao vermelho!"
+        
+    def phase_3_buttons(self):
+        return [
+            Button(100, 950, 250, 70, "VERIFICAR",
+                   lambda: self.verify_weighted()),
+            Button(380, 950, 280, 70, "RESETAR CAMINHO",
+                   lambda: self.reset_current_path()),
+            Button(690, 950, 250, 70, "NOVO GRAFO",
+                   lambda: self.new_graph()),
+            Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU",
+                   lambda: self.change_state(GameState.MAIN_MENU)),
+        ]
+        
     def setup_victory(self):
         """Tela de vitória"""
         self.buttons = [
@@ -517,6 +1313,8 @@ class CyberNexus:
                        lambda: self.reset_current_path()),
                 Button(690, 950, 250, 70, "NOVO GRAFO", 
                        lambda: self.new_graph()),
+                Button(970, 950, 280, 70, "ANIMAR BFS",
+                       lambda: self.start_visualizer("BFS")),
                 Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU", 
                        lambda: self.change_state(GameState.MAIN_MENU)),
             ]
@@ -528,6 +1326,8 @@ class CyberNexus:
                        lambda: self.reset_current_path()),
                 Button(690, 950, 250, 70, "NOVO GRAFO", 
                        lambda: self.new_graph()),
+                Button(970, 950, 280, 70, "ANIMAR DFS",
+                       lambda: self.start_visualizer("DFS")),
                 Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU", 
                        lambda: self.change_state(GameState.MAIN_MENU)),
             ]
@@ -540,12 +1340,87 @@ class CyberNexus:
                 Button(SCREEN_WIDTH - 400, 950, 300, 80, "VOLTAR", 
                        lambda: self.change_state(GameState.MAIN_MENU)),
             ]
+        elif self.state == GameState.PHASE_3_PLAY:
+            self.buttons = self.phase_3_buttons()
         
-        if self.state in [GameState.PHASE_1_PLAY, GameState.PHASE_2_PLAY]:
+        if self.state in PHASE_PLAY_STATES:
             self.show_available_paths()
     
+    def next_seed(self, stream):
+        """Semente do próximo grafo de `stream`, ou None numa sessão sem semente"""
+        if self.seed is None:
+            return None
+        k = self.seed_counters.get(stream, 0)
+        self.seed_counters[stream] = k + 1
+        return derive_seed(self.seed, stream, k)
+        
+    def make_graph(self, seed=None, stream="fase"):
+        """Próximo grafo de fase: arquivo, puzzle do banco ou gerado na hora"""
+        if seed is None:
+            seed = self.next_seed(stream)
+        if self.graph_path:
+            return load_graph(self.graph_path)
+        if self.puzzle_bank is not None and len(self.puzzle_bank):
+            if self.next_puzzle is None:
+                return self.puzzle_bank.random(random.Random(seed))
+            k = self.next_puzzle % len(self.puzzle_bank)
+            self.next_puzzle = k + 1
+            return self.puzzle_bank.load(k)
+        return generate_random_graph(self.num_nodes, *graph_bounds(self.num_nodes), seed=seed)
+        
+    def make_weighted_graph(self):
+        """Grafo da fase bônus; grafos de arquivo/banco sem custos ganham custos aqui"""
+        seed = self.next_seed("bonus")
+        if self.graph_path or (self.puzzle_bank is not None and len(self.puzzle_bank)):
+            graph = self.make_graph(seed)
+            if not graph.weighted:
+                assign_weights(graph, random.Random(seed))
+            return graph
+        return generate_random_graph(self.num_nodes, *graph_bounds(self.num_nodes),
+                                     weighted=True, seed=seed)
+        
+    def start_visualizer(self, algorithm):
+        """Troca o jogo pela execução animada de BFS/DFS no grafo atual"""
+        self.graph.reset()
+        self.player_path = []
+        self.selected_node = None
+        self.visualizer = AlgorithmVisualizer(self.graph, algorithm)
+        self.buttons = [
+            Button(100, 950, 250, 70, "PLAY/PAUSA",
+                   lambda: self.visualizer.toggle()),
+            Button(380, 950, 200, 70, "PASSO",
+                   lambda: self.step_visualizer()),
+            Button(610, 950, 250, 70, "MAIS LENTO",
+                   lambda: self.visualizer.change_speed(-1)),
+            Button(890, 950, 250, 70, "MAIS RÁPIDO",
+                   lambda: self.visualizer.change_speed(1)),
+            Button(SCREEN_WIDTH - 350, 950, 250, 70, "FECHAR",
+                   lambda: self.close_visualizer()),
+        ]
+        
+    def step_visualizer(self):
+        self.visualizer.playing = False
+        self.visualizer.step()
+        
+    def close_visualizer(self):
+        self.visualizer = None
+        self.reset_current_path()
+        
+    def use_puzzle(self, puzzle):
+        """Adota um grafo já preparado, com suas estatísticas de caminhos"""
+        self.graph = puzzle.graph
+        self.puzzle = puzzle
+        
+    def save_current_graph(self):
+        """Salva o grafo em jogo para ser distribuído (--graph ARQUIVO)"""
+        path = time.strftime("grafo_%Y%m%d_%H%M%S.cnxg")
+        save_graph(path, self.graph)
+        self.message = f"Grafo salvo em {path}"
+        self.message_color = COLOR_SUCCESS
+        
     def new_graph(self):
         """Gera um novo grafo aleatório"""
+        self.visualizer = None
         if self.state == GameState.PHASE_1_PLAY:
             self.current_graph_state = None
             self.setup_phase_1_play()
@@ -554,120 +1429,104 @@ class CyberNexus:
             self.current_graph_state = None
             self.setup_phase_2_play()
             self.message = "Novo grafo gerado! Tente encontrar o caminho DFS."
+        elif self.state == GameState.PHASE_3_PLAY:
+            self.current_graph_state = None
+            self.setup_phase_3_play()
+            self.message = "Novo grafo gerado! Tente encontrar o caminho de menor custo."
         self.message_color = COLOR_TEXT
         
+    @property
+    def player_path(self):
+        """Caminho do jogador (mantido pelo validador incremental)"""
+        return self.validator.path
+        
+    @player_path.setter
+    def player_path(self, path):
+        self.validator = PathValidator(self.graph)
+        for node in path:
+            self.validator.add(node)
+        
     def handle_node_click(self, pos):
         """Lidar com clique em nós"""
-        for node in self.graph.nodes:
-            if node.contains_point(pos[0], pos[1]):
-                if not self.player_path:
-                    if node == self.graph.start_node:
-                        self.player_path.append(node)
-                        node.in_path = True
-                        self.message = f"Nó {node.id} selecionado! Continue o caminho..."
-                        self.message_color = COLOR_TEXT
-                    else:
-                        self.message = "Você deve começar pelo nó VERDE (inicial)!"
-                        self.message_color = COLOR_ERROR
-                else:
-                    last_node = self.player_path[-1]
-                    
-                    if node in last_node.neighbors and node not in self.player_path:
-                        self.player_path.append(node)
-                        node.in_path = True
-                        
-                        for edge in self.graph.edges:
-                            if (edge.node1 == last_node and edge.node2 == node) or \
-                               (edge.node1 == node and edge.node2 == last_node):
-                                edge.player_selected = True
-                        
-                        if node.is_target:
-                            self.message = "Alvo alcançado! Clique em VERIFICAR para validar seu caminho."
-                            self.message_color = COLOR_SUCCESS
-                        else:
-                            self.message = f"Nó {node.id} adicionado ao caminho!"
-                            self.message_color = COLOR_TEXT
-                    elif node in self.player_path:
-                        self.message = "Este nó já está no caminho!"
-                        self.message_color = COLOR_ERROR
-                    else:
-                        self.message = "Este nó não é vizinho do último nó selecionado!"
-                        self.message_color = COLOR_ERROR
-                return
-                
-    def show_available_paths(self):
-        """Mostra quantos caminhos diferentes existem até o alvo"""
-        if self.state not in [GameState.PHASE_1_PLAY, GameState.PHASE_2_PLAY]:
+        node = self.graph.node_at(*self.camera.to_world(*pos))
+        if node is None:
             return
         
-        def count_paths_dfs(current, target, visited, path_count):
-            if current == target:
-                return path_count + 1
-            
-            visited.add(current)
+        last_node = self.player_path[-1] if self.player_path else None
+        result = self.validator.add(node)
+        
+        if result == ClickResult.NOT_START:
+            self.message = "Você deve começar pelo nó VERDE (inicial)!"
+            self.message_color = COLOR_ERROR
+        elif result == ClickResult.ALREADY_IN_PATH:
+            self.message = "Este nó já está no caminho!"
+            self.message_color = COLOR_ERROR
+        elif result == ClickResult.NOT_NEIGHBOR:
+            self.message = "Este nó não é vizinho do último nó selecionado!"
+            self.message_color = COLOR_ERROR
+        else:
+            self.graph.add_to_path(node)
+            if last_node is not None:
+                edge = self.graph.get_edge(last_node, node)
+                if edge is not None:
+                    self.graph.select_edge(edge)
             
-            for neighbor in current.neighbors:
-                if neighbor not in visited:
-                    path_count = count_paths_dfs(neighbor, target, visited, path_count)
+            if result == ClickResult.STARTED:
+                self.message = f"Nó {node.id} selecionado! Continue o caminho..."
+                self.message_color = COLOR_TEXT
+            elif result == ClickResult.REACHED_TARGET:
+                self.message = "Alvo alcançado! Clique em VERIFICAR para validar seu caminho."
+                self.message_color = COLOR_SUCCESS
+            else:
+                self.message = f"Nó {node.id} adicionado ao caminho!"
+                self.message_color = COLOR_TEXT
             
-            visited.remove(current)
-            return path_count
+            # Retorno imediato a cada clique
+            if result != ClickResult.REACHED_TARGET and self.validator.dead_end:
+                self.message = f"Nó {node.id}: beco sem saída! Resete o caminho para retroceder."
+                self.message_color = COLOR_WARNING
+            elif self.state == GameState.PHASE_1_PLAY and not self.validator.on_shortest:
+                self.message += " (fora de um caminho mínimo)"
+                self.message_color = COLOR_WARNING
+            elif self.state == GameState.PHASE_3_PLAY:
+                self.message += f" Custo até aqui: {path_cost(self.graph, self.player_path)}"
+                
+    def show_available_paths(self):
+        """Mostra quantos caminhos diferentes existem até o alvo"""
+        if self.state not in PHASE_PLAY_STATES:
+            return
         
-        visited = set()
-        num_paths = count_paths_dfs(self.graph.start_node, self.graph.target_node, visited, 0)
+        if self.puzzle is not None and self.puzzle.graph is self.graph:
+            stats = self.puzzle.stats
+        else:
+            stats = analyze_paths(self.graph)
         
-        path_info = f"Há {num_paths} caminho(s) possível(is) até o alvo."
+        if stats.exact:
+            path_info = f"Há {stats.simple_paths} caminho(s) possível(is) até o alvo."
+        else:
+            path_info = f"Há ≥ {stats.simple_paths} caminho(s) possível(is) até o alvo."
         
         if self.message_color != COLOR_ERROR:
             self.message = path_info
             self.message_color = COLOR_TEXT
     
-    def verify_bfs(self):
-        """Verificar se o caminho do jogador é um BFS válido"""
-        if not self.player_path:
+    def show_verification_error(self, result):
+        """Mensagens de erro comuns às verificações BFS e DFS"""
+        if result.status == VerifyStatus.EMPTY:
             self.message = "Você não criou nenhum caminho ainda!"
-            self.message_color = COLOR_ERROR
-            return
-            
-        if self.player_path[-1] != self.graph.target_node:
+        elif result.status == VerifyStatus.INCOMPLETE:
             self.message = "Você não alcançou o nó alvo!"
-            self.message_color = COLOR_ERROR
-            return
-        
-        # Executar BFS correto
-        queue = deque([self.graph.start_node])
-        visited = {self.graph.start_node}
-        parent = {self.graph.start_node: None}
-        found = False
-        
-        while queue:
-            current = queue.popleft()
-            
-            if current == self.graph.target_node:
-                found = True
-                break
-            
-            for neighbor in current.neighbors:
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    parent[neighbor] = current
-                    queue.append(neighbor)
-        
-        if not found:
+        elif result.status == VerifyStatus.NO_PATH:
             self.message = "Erro: O grafo não possui caminho válido!"
-            self.message_color = COLOR_ERROR
-            return
+        else:
+            self.message = "Caminho inválido! Verifique as conexões."
+        self.message_color = COLOR_ERROR
         
-        # Reconstruir caminho BFS correto
-        bfs_path = []
-        current = self.graph.target_node
-        while current is not None:
-            bfs_path.append(current)
-            current = parent[current]
-        bfs_path.reverse()
+    def verify_bfs(self):
+        """Verificar se o caminho do jogador é um BFS válido"""
+        result = self.validator.check_bfs()
         
-        # Verificar se o caminho do jogador segue a ordem BFS
-        if self.player_path == bfs_path:
+        if result.status == VerifyStatus.SUCCESS:
             self.message = "🎉 SUCESSO! Sistema hackeado! Você executou um BFS perfeito!"
             self.message_color = COLOR_SUCCESS
             self.phase1_completed = True
@@ -680,33 +1539,63 @@ class CyberNexus:
                 Button(SCREEN_WIDTH//2 + 50, 950, 300, 70, "PRÓXIMA FASE", 
                        lambda: self.change_state(GameState.PHASE_2_INTRO)),
             ]
+        elif result.status == VerifyStatus.SUBOPTIMAL:
+            bfs_path = result.reference
+            bfs_path_ids = [str(node.id) for node in bfs_path]
+            
+            self.message = f"Caminho válido, mas não é BFS ótimo. Um caminho BFS correto: {' → '.join(bfs_path_ids)}"
+            self.message_color = COLOR_ERROR
+            
+            self.buttons = [
+                Button(100, 950, 250, 70, "TENTAR NOVAMENTE",
+                       lambda: self.reset_current_path()),
+                Button(380, 950, 300, 70, "VER CAMINHO CORRETO",
+                       lambda: self.show_correct_path(bfs_path)),
+                Button(710, 950, 250, 70, "NOVO GRAFO",
+                       lambda: self.new_graph()),
+                Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU",
+                       lambda: self.change_state(GameState.MAIN_MENU)),
+            ]
         else:
-            is_valid_path = True
-            for i in range(len(self.player_path) - 1):
-                if self.player_path[i+1] not in self.player_path[i].neighbors:
-                    is_valid_path = False
-                    break
+            self.show_verification_error(result)
+    
+    def verify_weighted(self):
+        """Verificar se o caminho do jogador tem custo mínimo (fase bônus)"""
+        result = self.validator.check_weighted()
+        
+        if result.status == VerifyStatus.SUCCESS:
+            cost = path_cost(self.graph, self.player_path)
+            self.message = f"🎉 SUCESSO! Rota de custo mínimo ({cost})! Você pensou como Dijkstra!"
+            self.message_color = COLOR_SUCCESS
             
-            if is_valid_path:
-                bfs_path_ids = [str(node.id) for node in bfs_path]
-                player_path_ids = [str(node.id) for node in self.player_path]
-                
-                self.message = f"Caminho válido, mas não é BFS ótimo. Caminho BFS correto: {' → '.join(bfs_path_ids)}"
-                self.message_color = COLOR_ERROR
-                
-                self.buttons = [
-                    Button(100, 950, 250, 70, "TENTAR NOVAMENTE",
-                           lambda: self.reset_current_path()),
-                    Button(380, 950, 300, 70, "VER CAMINHO CORRETO",
-                           lambda: self.show_correct_path(bfs_path)),
-                    Button(710, 950, 250, 70, "NOVO GRAFO",
-                           lambda: self.new_graph()),
-                    Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU",
-                           lambda: self.change_state(GameState.MAIN_MENU)),
-                ]
-            else:
-                self.message = "Caminho inválido! Verifique as conexões."
-                self.message_color = COLOR_ERROR
+            self.buttons = [
+                Button(100, 950, 280, 70, "CONTINUAR PRATICANDO",
+                       lambda: self.reset_current_path()),
+                Button(410, 950, 250, 70, "NOVO GRAFO",
+                       lambda: self.new_graph()),
+                Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU",
+                       lambda: self.change_state(GameState.MAIN_MENU)),
+            ]
+        elif result.status == VerifyStatus.SUBOPTIMAL:
+            best_path = result.reference
+            best_path_ids = [str(node.id) for node in best_path]
+            
+            self.message = (f"Caminho válido, mas custa {path_cost(self.graph, self.player_path)}. "
+                            f"Custo mínimo {path_cost(self.graph, best_path)}: {' → '.join(best_path_ids)}")
+            self.message_color = COLOR_ERROR
+            
+            self.buttons = [
+                Button(100, 950, 250, 70, "TENTAR NOVAMENTE",
+                       lambda: self.reset_current_path()),
+                Button(380, 950, 300, 70, "VER CAMINHO CORRETO",
+                       lambda: self.show_correct_path(best_path)),
+                Button(710, 950, 250, 70, "NOVO GRAFO",
+                       lambda: self.new_graph()),
+                Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU",
+                       lambda: self.change_state(GameState.MAIN_MENU)),
+            ]
+        else:
+            self.show_verification_error(result)
     
     def show_correct_path(self, correct_path):
         """Mostra o caminho correto ao jogador"""
@@ -715,17 +1604,19 @@ class CyberNexus:
         for i in range(len(correct_path) - 1):
             node1 = correct_path[i]
             node2 = correct_path[i + 1]
-            node1.in_path = True
-            node2.in_path = True
+            self.graph.add_to_path(node1)
+            self.graph.add_to_path(node2)
             
-            for edge in self.graph.edges:
-                if (edge.node1 == node1 and edge.node2 == node2) or \
-                   (edge.node1 == node2 and edge.node2 == node1):
-                    edge.player_selected = True
+            edge = self.graph.get_edge(node1, node2)
+            if edge is not None:
+                self.graph.select_edge(edge)
         
-        correct_path[-1].in_path = True
+        self.graph.add_to_path(correct_path[-1])
         
-        self.message = "Caminho BFS correto mostrado em amarelo. Tente replicá-lo!"
+        if self.state == GameState.PHASE_3_PLAY:
+            self.message = "Caminho de custo mínimo mostrado em amarelo. Tente replicá-lo!"
+        else:
+            self.message = "Caminho BFS correto mostrado em amarelo. Tente replicá-lo!"
         self.message_color = COLOR_SUCCESS
         self.player_path = []
         
@@ -748,6 +1639,15 @@ class CyberNexus:
                 Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU",
                        lambda: self.change_state(GameState.MAIN_MENU)),
             ]
+        elif self.state == GameState.PHASE_3_PLAY:
+            self.buttons = [
+                Button(100, 950, 250, 70, "TENTAR EU MESMO",
+                       lambda: self.reset_to_phase3()),
+                Button(380, 950, 250, 70, "NOVO GRAFO",
+                       lambda: self.new_graph()),
+                Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU",
+                       lambda: self.change_state(GameState.MAIN_MENU)),
+            ]
     
     def reset_to_phase1(self):
         """Reseta para a fase 1 com botões originais"""
@@ -765,6 +1665,8 @@ class CyberNexus:
                    lambda: self.reset_current_path()),
             Button(690, 950, 250, 70, "NOVO GRAFO", 
                    lambda: self.new_graph()),
+            Button(970, 950, 280, 70, "ANIMAR BFS",
+                   lambda: self.start_visualizer("BFS")),
             Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU", 
                    lambda: self.change_state(GameState.MAIN_MENU)),
         ]
@@ -787,33 +1689,30 @@ class CyberNexus:
                    lambda: self.reset_current_path()),
             Button(690, 950, 250, 70, "NOVO GRAFO", 
                    lambda: self.new_graph()),
+            Button(970, 950, 280, 70, "ANIMAR DFS",
+                   lambda: self.start_visualizer("DFS")),
             Button(SCREEN_WIDTH - 350, 950, 250, 70, "MENU", 
                    lambda: self.change_state(GameState.MAIN_MENU)),
         ]
         
         self.show_available_paths()
                 
+    def reset_to_phase3(self):
+        """Reseta para a fase bônus com botões originais"""
+        self.graph.reset()
+        self.player_path = []
+        self.selected_node = None
+        self.message = "Tente encontrar o caminho de menor custo!"
+        self.message_color = COLOR_TEXT
+        self.buttons = self.phase_3_buttons()
+        self.show_available_paths()
+                
     def verify_dfs(self):
         """Verificar se o caminho do jogador é um DFS válido"""
-        if not self.player_path:
-            self.message = "Você não criou nenhum caminho ainda!"
-            self.message_color = COLOR_ERROR
-            return
-            
-        if self.player_path[-1] != self.graph.target_node:
-            self.message = "Você não alcançou o nó alvo!"
-            self.message_color = COLOR_ERROR
-            return
-        
-        is_valid = True
-        for i in range(len(self.player_path) - 1):
-            if self.player_path[i+1] not in self.player_path[i].neighbors:
-                is_valid = False
-                break
+        result = self.validator.check_dfs()
         
-        if not is_valid:
-            self.message = "Caminho inválido! Verifique as conexões."
-            self.message_color = COLOR_ERROR
+        if result.status != VerifyStatus.SUCCESS:
+            self.show_verification_error(result)
             return
         
         player_path_ids = [str(node.id) for node in self.player_path]
@@ -840,26 +1739,20 @@ class CyberNexus:
                        lambda: self.change_state(GameState.MAIN_MENU)),
             ]
             
-    def draw_grid(self):
-        """Desenhar grade cyberpunk de fundo"""
-        for x in range(0, SCREEN_WIDTH, 60):
-            pygame.draw.line(self.screen, COLOR_GRID, (x, 0), (x, SCREEN_HEIGHT), 2)
-        for y in range(0, SCREEN_HEIGHT, 60):
-            pygame.draw.line(self.screen, COLOR_GRID, (0, y), (SCREEN_WIDTH, y), 2)
-            
-    def draw_title(self, text, y=120, size=96):
+    def draw_title(self, text, y=120, size=96, surface=None):
         """Desenhar título"""
-        font = pygame.font.Font(None, size)
-        title = font.render(text, True, COLOR_TEXT_TITLE)
+        surface = surface or self.screen
+        title = text_cache.render(text, size, COLOR_TEXT_TITLE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, y))
         
-        shadow = font.render(text, True, (50, 0, 25))
+        shadow = text_cache.render(text, size, (50, 0, 25))
         shadow_rect = shadow.get_rect(center=(SCREEN_WIDTH // 2 + 5, y + 5))
-        self.screen.blit(shadow, shadow_rect)
-        self.screen.blit(title, title_rect)
+        surface.blit(shadow, shadow_rect)
+        surface.blit(title, title_rect)
         
-    def draw_text_box(self, lines, y_start=250, width=1200):
+    def draw_text_box(self, lines, y_start=250, width=1200, surface=None):
         """Desenhar caixa de texto com múltiplas linhas"""
+        surface = surface or self.screen
         x = SCREEN_WIDTH // 2 - width // 2
         line_height = 45
         padding = 30
@@ -870,47 +1763,41 @@ class CyberNexus:
         bg_surface = pygame.Surface((width, total_height), pygame.SRCALPHA)
         pygame.draw.rect(bg_surface, (20, 20, 50, 220), bg_surface.get_rect(), border_radius=15)
         pygame.draw.rect(bg_surface, COLOR_NODE, bg_surface.get_rect(), 4, border_radius=15)
-        self.screen.blit(bg_surface, (x, y_start))
+        surface.blit(bg_surface, (x, y_start))
         
-        font = pygame.font.Font(None, 32)
         y = y_start + padding
         for line in lines:
-            text = font.render(line, True, COLOR_TEXT)
+            text = text_cache.render(line, 32, COLOR_TEXT)
             text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, y))
-            self.screen.blit(text, text_rect)
+            surface.blit(text, text_rect)
             y += line_height
             
     def draw_message(self):
         """Desenhar mensagem de status"""
         if self.message:
-            font = pygame.font.Font(None, 36)
-            text = font.render(self.message, True, self.message_color)
+            text = text_cache.render(self.message, 36, self.message_color)
             text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, 150))
             
             bg_rect = text_rect.inflate(40, 20)
-            bg_surface = pygame.Surface((bg_rect.width, bg_rect.height), pygame.SRCALPHA)
-            pygame.draw.rect(bg_surface, (0, 0, 0, 200), bg_surface.get_rect(), border_radius=10)
-            self.screen.blit(bg_surface, bg_rect)
+            self.screen.blit(self.compositor.panel(bg_rect.size, (0, 0, 0, 200)), bg_rect)
             
             self.screen.blit(text, text_rect)
             
-    def draw_legend(self):
-        """Desenhar legenda de cores e informações do grafo"""
-        panel_x = 1550
-        panel_y = 50
-        panel_width = 320
-        panel_height = 250
+    def draw_visualizer_status(self):
+        """Linha de estado do visualizador (fonte direta: muda a cada passo)"""
+        text = text_cache.get_font(30).render(self.visualizer.status(), True, COLOR_TEXT)
+        text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, 150))
+        bg_rect = text_rect.inflate(40, 20)
+        self.screen.blit(self.compositor.panel(bg_rect.size, (0, 0, 0, 200)), bg_rect)
+        self.screen.blit(text, text_rect)
         
-        panel_surface = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
-        pygame.draw.rect(panel_surface, (10, 10, 30, 220), panel_surface.get_rect(), border_radius=15)
-        pygame.draw.rect(panel_surface, COLOR_NODE, panel_surface.get_rect(), 3, border_radius=15)
-        self.screen.blit(panel_surface, (panel_x, panel_y))
+    def build_legend_panel(self):
+        """Painel da legenda de cores, renderizado uma única vez"""
+        panel = self.compositor.panel((320, 250), (10, 10, 30, 220), COLOR_NODE, 15).copy()
         
-        font_title = pygame.font.Font(None, 36)
-        title = font_title.render("LEGENDA", True, COLOR_TEXT_TITLE)
-        self.screen.blit(title, (panel_x + 30, panel_y + 20))
+        title = text_cache.render("LEGENDA", 36, COLOR_TEXT_TITLE)
+        panel.blit(title, (30, 20))
         
-        font_text = pygame.font.Font(None, 28)
         legend_items = [
             ("Nó Inicial", COLOR_NODE_START),
             ("Nó Normal", COLOR_NODE),
@@ -918,19 +1805,29 @@ class CyberNexus:
             ("Nó Alvo", COLOR_NODE_TARGET),
         ]
         
-        y_offset = panel_y + 70
+        y_offset = 70
         for label, color in legend_items:
-            pygame.draw.circle(self.screen, color, (panel_x + 35, y_offset + 10), 16)
-            pygame.draw.circle(self.screen, (255, 255, 255), (panel_x + 35, y_offset + 10), 16, 3)
-            text = font_text.render(label, True, COLOR_TEXT)
-            self.screen.blit(text, (panel_x + 60, y_offset))
+            pygame.draw.circle(panel, color, (35, y_offset + 10), 16)
+            pygame.draw.circle(panel, (255, 255, 255), (35, y_offset + 10), 16, 3)
+            text = text_cache.render(label, 28, COLOR_TEXT)
+            panel.blit(text, (60, y_offset))
             y_offset += 40
+        return panel
+        
+    def draw_legend(self):
+        """Desenhar legenda de cores e informações do grafo"""
+        panel_x = 1550
+        panel_y = 50
+        
+        if self.legend_panel is None:
+            self.legend_panel = self.build_legend_panel()
+        self.screen.blit(self.legend_panel, (panel_x, panel_y))
     
-        if self.state in [GameState.PHASE_1_PLAY, GameState.PHASE_2_PLAY] and self.graph.nodes:
-            y_offset += 10
+        if self.state in PHASE_PLAY_STATES and self.graph.nodes:
+            # Abaixo dos quatro itens da legenda
+            y_offset = panel_y + 70 + 4 * 40 + 10
             
-            total_degree = sum(len(node.neighbors) for node in self.graph.nodes)
-            avg_degree = total_degree / len(self.graph.nodes)
+            avg_degree = average_degree(self.graph)
             
             if avg_degree > 3.5:
                 pygame.draw.circle(self.screen, COLOR_SUCCESS, (panel_x + 240, y_offset + 10), 10)
@@ -939,44 +1836,129 @@ class CyberNexus:
             else:
                 pygame.draw.circle(self.screen, COLOR_ERROR, (panel_x + 240, y_offset + 10), 10)
                 
-    def handle_events(self):
-        for event in pygame.event.get():
+    def draw_search_stats(self):
+        """Painel abaixo da legenda: nós expandidos e tempo de cada busca"""
+        panel_x = 1550
+        panel_y = 320
+        panel_width = 320
+        panel_height = 230
+        
+        panel_surface = self.compositor.panel((panel_width, panel_height), (10, 10, 30, 220),
+                                              COLOR_NODE, 15)
+        self.screen.blit(panel_surface, (panel_x, panel_y))
+        
+        title = text_cache.render("BUSCAS", 36, COLOR_TEXT_TITLE)
+        self.screen.blit(title, (panel_x + 30, panel_y + 20))
+        
+        columns = (panel_x + 20, panel_x + 125, panel_x + 185, panel_x + 245)
+        rows = [("", "custo", "nós", "ms")]
+        for name, stats in self.search_stats.items():
+            rows.append((name, str(stats.cost), str(stats.expanded), f"{stats.elapsed_ms:.2f}"))
+        
+        y_offset = panel_y + 70
+        for row in rows:
+            color = COLOR_TEXT if row[0] else COLOR_EDGE_WEIGHT
+            for x, cell in zip(columns, row):
+                if cell:
+                    self.screen.blit(text_cache.render(cell, 26, color), (x, y_offset))
+            y_offset += 36
+        
+    def is_animating(self):
+        """Há nós com brilho decaindo ou uma travessia rodando na tela?"""
+        if self.visualizer is not None and self.visualizer.playing:
+            return True
+        return any(node.glow > 0 for node in self.graph.active_nodes)
+        
+    def handle_events(self, events=None):
+        if events is None:
+            events = pygame.event.get()
+        in_play = self.state in PLAY_STATES
+        for event in coalesce_motion(events):
+            if event.type == pygame.MOUSEMOTION:
+                # Movimento só suja o frame se mudar algum hover ou a vista
+                button, changed = self.input.hover(self.buttons, event.pos)
+                if changed:
+                    self.scheduler.mark_dirty()
+                if in_play:
+                    if self.pan_button is not None:
+                        self.camera.pan(*event.rel)
+                        self.scheduler.mark_dirty()
+                    hovered = None
+                    if button is None:
+                        hovered = self.graph.node_at(*self.camera.to_world(*event.pos))
+                    if self.graph.set_hover(hovered):
+                        self.scheduler.mark_dirty()
+                continue
+            
+            self.scheduler.mark_dirty()
+            
             if event.type == pygame.QUIT:
                 self.running = False
+            
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.presented_screen = None
                 
-            if event.type == pygame.KEYDOWN:
+            elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     if self.state != GameState.MAIN_MENU:
                         self.change_state(GameState.MAIN_MENU)
                     else:
                         self.running = False
+                elif event.key == pygame.K_F3:
+                    self.profiler.visible = not self.profiler.visible
+                elif event.key == pygame.K_F4:
+                    print(f"Tempos de frame salvos em {self.profiler.export_csv()}")
+                elif event.key == pygame.K_F5:
+                    if self.state in PHASE_PLAY_STATES:
+                        self.save_current_graph()
+                elif event.key == pygame.K_HOME:
+                    self.camera.fit(self.graph)
+                elif self.visualizer is not None:
+                    if event.key == pygame.K_SPACE:
+                        self.visualizer.toggle()
+                    elif event.key == pygame.K_RIGHT:
+                        self.step_visualizer()
+                    elif event.key == pygame.K_UP:
+                        self.visualizer.change_speed(1)
+                    elif event.key == pygame.K_DOWN:
+                        self.visualizer.change_speed(-1)
             
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if self.state in [GameState.TUTORIAL_PLAY, GameState.PHASE_1_PLAY, GameState.PHASE_2_PLAY]:
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 2, 3):
+                # Ordem de teste: botões, depois o grafo; o primeiro que tratar encerra
+                if self.input.click(self.buttons, event.pos):
+                    # A ação pode ter trocado de tela: o resto do frame usa o novo estado
+                    in_play = self.state in PLAY_STATES
+                elif in_play and event.button == 1 and self.visualizer is None:
+                    self.profiler.begin_click()
                     self.handle_node_click(event.pos)
+                elif in_play:
+                    # Botão direito/do meio: arrastar a vista
+                    self.pan_button = event.button
             
-            for button in self.buttons:
-                button.handle_event(event)
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == self.pan_button:
+                self.pan_button = None
+            
+            elif event.type == pygame.MOUSEWHEEL and in_play:
+                # Roda: zoom no ponto do mouse
+                pos = getattr(event, "pos", None) or pygame.mouse.get_pos()
+                self.camera.zoom_at(*pos, event.y)
                 
-    def draw(self):
-        self.screen.fill(COLOR_BG)
-        self.draw_grid()
-        
-        if self.state == GameState.MAIN_MENU:
-            self.draw_title("CYBER NEXUS", y=180, size=120)
+    def render_static_screen(self, surface, state):
+        """Fundo, título e textos de uma tela sem grafo (renderizados uma vez)"""
+        self.compositor.draw_background(surface)
+        if state == GameState.MAIN_MENU:
+            self.draw_title("CYBER NEXUS", y=180, size=120, surface=surface)
             
-            font = pygame.font.Font(None, 48)
-            subtitle = font.render("Jogo Educacional de Algoritmos de Grafos", True, COLOR_TEXT)
+            subtitle = text_cache.render("Jogo Educacional de Algoritmos de Grafos", 48, COLOR_TEXT)
             subtitle_rect = subtitle.get_rect(center=(SCREEN_WIDTH // 2, 280))
-            self.screen.blit(subtitle, subtitle_rect)
+            surface.blit(subtitle, subtitle_rect)
             
-            font_small = pygame.font.Font(None, 32)
-            credits = font_small.render("Por Pedro Henrique Faria e Caio Leal Granja", True, COLOR_TEXT)
+            credits = text_cache.render("Por Pedro Henrique Faria e Caio Leal Granja", 32, COLOR_TEXT)
             credits_rect = credits.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 60))
-            self.screen.blit(credits, credits_rect)
+            surface.blit(credits, credits_rect)
             
-        elif self.state == GameState.TUTORIAL_INTRO:
-            self.draw_title("TUTORIAL", y=120)
+        elif state == GameState.TUTORIAL_INTRO:
+            self.draw_title("TUTORIAL", y=120, surface=surface)
             
             lines = [
                 "Bem-vindo ao Cyber Nexus!",
@@ -991,15 +1973,10 @@ class CyberNexus:
                 "",
                 "Vamos praticar no tutorial!"
             ]
-            self.draw_text_box(lines, y_start=250)
-            
-        elif self.state == GameState.TUTORIAL_PLAY:
-            self.draw_message()
-            self.graph.draw(self.screen)
-            self.draw_legend()
+            self.draw_text_box(lines, y_start=250, surface=surface)
             
-        elif self.state == GameState.PHASE_1_INTRO:
-            self.draw_title("FASE 1: BUSCA EM LARGURA (BFS)", y=100, size=72)
+        elif state == GameState.PHASE_1_INTRO:
+            self.draw_title("FASE 1: BUSCA EM LARGURA (BFS)", y=100, size=72, surface=surface)
             
             lines = [
                 "MISSÃO: Hackear o sistema usando BFS",
@@ -1017,15 +1994,10 @@ class CyberNexus:
                 "",
                 "Dica: Pense em ondas se expandindo!"
             ]
-            self.draw_text_box(lines, y_start=200, width=1300)
+            self.draw_text_box(lines, y_start=200, width=1300, surface=surface)
             
-        elif self.state == GameState.PHASE_1_PLAY:
-            self.draw_message()
-            self.graph.draw(self.screen)
-            self.draw_legend()
-            
-        elif self.state == GameState.PHASE_2_INTRO:
-            self.draw_title("FASE 2: BUSCA EM PROFUNDIDADE (DFS)", y=100, size=72)
+        elif state == GameState.PHASE_2_INTRO:
+            self.draw_title("FASE 2: BUSCA EM PROFUNDIDADE (DFS)", y=100, size=72, surface=surface)
             
             lines = [
                 "MISSÃO: Penetrar o firewall usando DFS",
@@ -1043,15 +2015,31 @@ class CyberNexus:
                 "",
                 "Dica: Pense em explorar um labirinto!"
             ]
-            self.draw_text_box(lines, y_start=200, width=1300)
+            self.draw_text_box(lines, y_start=200, width=1300, surface=surface)
             
-        elif self.state == GameState.PHASE_2_PLAY:
-            self.draw_message()
-            self.graph.draw(self.screen)
-            self.draw_legend()
+        elif state == GameState.PHASE_3_INTRO:
+            self.draw_title("FASE BÔNUS: MENOR CUSTO (DIJKSTRA)", y=100, size=72, surface=surface)
+            
+            lines = [
+                "MISSÃO: Desviar o tráfego pela rota mais barata",
+                "",
+                "Agora cada conexão tem um CUSTO (o número sobre a aresta)",
+                "• O custo acompanha o comprimento da aresta",
+                "• Menos arestas nem sempre significa menor custo!",
+                "• Dijkstra expande sempre o nó de menor custo acumulado",
+                "• A* usa a distância em linha reta até o alvo como atalho",
+                "",
+                "COMO FAZER:",
+                "1. Comece pelo nó inicial (verde)",
+                "2. Some os custos das arestas que você usar",
+                "3. Chegue ao alvo (vermelho) com o menor custo total",
+                "",
+                "Dica: compare no painel quantos nós BFS, Dijkstra e A* expandem!"
+            ]
+            self.draw_text_box(lines, y_start=200, width=1300, surface=surface)
             
-        elif self.state == GameState.VICTORY:
-            self.draw_title("MISSÃO CUMPRIDA!", y=180, size=96)
+        elif state == GameState.VICTORY:
+            self.draw_title("MISSÃO CUMPRIDA!", y=180, size=96, surface=surface)
             
             lines = [
                 "🎉 PARABÉNS, HACKER! 🎉",
@@ -1066,25 +2054,185 @@ class CyberNexus:
                 "",
                 "O mundo cibernético está ao seu alcance!",
             ]
-            self.draw_text_box(lines, y_start=350, width=1200)
-            
+            self.draw_text_box(lines, y_start=350, width=1200, surface=surface)
+        
+    def draw_static_state(self, changed):
+        """Tela estática em cache; se ela já está exibida, redesenha só os
+        botões de `changed` (hover mudou).
+        
+        Retorna os retângulos alterados, ou None se a tela inteira mudou.
+        """
+        layer = self.compositor.static_screen(self.state, self.render_static_screen)
+        if self.presented_screen == self.state and not self.profiler.visible:
+            rects = []
+            for button in changed:
+                self.screen.blit(layer, button.rect, button.rect)
+                button.draw(self.screen)
+                rects.append(button.rect)
+            return rects
+        
+        self.screen.blit(layer, (0, 0))
         for button in self.buttons:
             button.draw(self.screen)
-            
-        pygame.display.flip()
+        self.presented_screen = None if self.profiler.visible else self.state
+        return None
         
-    def run(self):
+    def draw(self):
+        draw_started = time.perf_counter()
+        changed = self.input.take_changed()
+        if self.state in STATIC_SCREENS:
+            updated = self.draw_static_state(changed)
+        else:
+            # Fundo + grafo estático vêm da mesma camada em cache
+            self.camera.follow(self.graph)
+            self.compositor.draw_static_graph(self.screen, self.graph, self.camera,
+                                              self.visualizer)
+            if self.visualizer is not None:
+                self.draw_visualizer_status()
+            else:
+                self.draw_message()
+            draw_graph_dynamic(self.screen, self.graph, self.camera)
+            self.draw_legend()
+            if self.state == GameState.PHASE_3_PLAY and self.search_stats:
+                self.draw_search_stats()
+            for button in self.buttons:
+                button.draw(self.screen)
+            self.presented_screen = None
+            updated = None
+        
+        if self.profiler.visible:
+            self.profiler.draw_hud(self.screen)
+        
+        flip_started = time.perf_counter()
+        self.present(updated)
+        flipped_at = time.perf_counter()
+        self.profiler.record("draw_ms", flip_started - draw_started)
+        self.profiler.record("flip_ms", flipped_at - flip_started)
+        self.profiler.flipped(flipped_at)
+        
+    def loop(self, max_frames=None, source=None, recorder=None):
+        """Loop principal; retorna quantas iterações rodou.
+        
+        `source` (ReplaySource) substitui a fila do pygame e dita o relógio
+        do visualizador; `recorder` (SessionRecorder) grava cada iteração.
+        """
+        frames = 0
         while self.running:
-            self.handle_events()
-            self.draw()
-            self.clock.tick(FPS)
+            if max_frames is not None and frames >= max_frames:
+                break
+            if source is not None:
+                replayed = source.next_frame()
+                if replayed is None:
+                    break
+                now, events = replayed
+            else:
+                events = self.scheduler.poll_events()
+                now = time.perf_counter()
+            frames += 1
+            
+            self.profiler.begin_frame()
+            events = coalesce_motion(events)
+            if recorder is not None:
+                recorder.frame(now, events)
+            self.handle_events(events)
+            self.profiler.record("events_ms", time.perf_counter() - self.profiler.events_received_at)
             
+            if self.visualizer is not None and self.visualizer.update(now):
+                self.scheduler.mark_dirty()
+            self.scheduler.set_animating(self.is_animating())
+            if self.running and self.scheduler.should_draw():
+                self.draw()
+                wait_started = time.perf_counter()
+                self.scheduler.frame_done()
+                self.profiler.record("wait_ms", time.perf_counter() - wait_started)
+                self.profiler.end_frame()
+        return frames
+        
+    def shutdown(self):
+        self.prefetcher.cancel()
+        self.prefetcher.join()
+        if self.puzzle_bank is not None:
+            self.puzzle_bank.close()
         pygame.quit()
+        
+    def run(self, max_frames=None, recorder=None):
+        try:
+            self.loop(max_frames, recorder=recorder)
+        finally:
+            if recorder is not None:
+                recorder.close()
+        self.shutdown()
         sys.exit()
 
-def main():
-    game = CyberNexus()
-    game.run()
+def run_replay(path, realtime=False, max_frames=None, **options):
+    """Reproduz um log de sessão num CyberNexus sem janela e imprime os tempos"""
+    info, frames = read_log(path)
+    game = CyberNexus(num_nodes=info.num_nodes, scaled=info.scaled, seed=info.seed, **options)
+    # Todos os frames no resumo; o ritmo vem do log, não do clock
+    game.profiler = FrameProfiler(history=None)
+    game.scheduler.animation_fps = game.scheduler.idle_fps = 0
+    
+    started = time.perf_counter()
+    count = game.loop(max_frames, source=ReplaySource(frames, realtime))
+    elapsed = time.perf_counter() - started
+    print(f"Sessão {path} (semente {info.seed}, {info.num_nodes} nós)")
+    for line in replay_report(game.profiler, count, elapsed):
+        print(line)
+    print(f"Estado final: {game.state.name} — {game.message}")
+    game.shutdown()
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cyber Nexus - Jogo Educacional de Grafos")
+    parser.add_argument("--headless", action="store_true",
+                        help="roda sem janela (driver SDL dummy), para automação")
+    parser.add_argument("--max-frames", type=int, default=None,
+                        help="encerra após N iterações do loop principal")
+    parser.add_argument("--bank", help="banco de puzzles (.cnxb) de onde tirar os grafos")
+    parser.add_argument("--puzzle", type=int, default=None,
+                        help="índice do primeiro puzzle do banco (padrão: aleatório)")
+    parser.add_argument("--graph", help="grafo salvo (.cnxg) usado em todas as fases")
+    parser.add_argument("--nodes", type=int, default=12,
+                        help="nós dos grafos gerados (acima de 12, use a roda e o botão direito)")
+    parser.add_argument("--scaled", action="store_true",
+                        help="janela pygame.SCALED, ajustada à tela (notebooks 1366x768)")
+    parser.add_argument("--vsync", action="store_true", help="sincronia vertical (implica --scaled)")
+    parser.add_argument("--prefetch", type=int, default=PREFETCH_DEPTH,
+                        help="grafos preparados com antecedência (0 desliga a thread)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="semente da sessão: mesmos grafos a cada execução")
+    parser.add_argument("--record", help="grava a entrada e a semente neste log (.cnxr)")
+    parser.add_argument("--replay", help="reproduz um log gravado sem janela e mostra os tempos")
+    parser.add_argument("--realtime", action="store_true",
+                        help="na reprodução, respeita os tempos gravados")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.headless or args.replay:
+        # Precisa ser definido antes de pygame.init()
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    if args.replay:
+        # Banco/arquivo de grafos não vão no log: passe os mesmos da gravação
+        return run_replay(args.replay, args.realtime, args.max_frames,
+                          bank_path=args.bank, puzzle=args.puzzle, graph_path=args.graph,
+                          prefetch_depth=args.prefetch)
+    
+    seed = args.seed
+    if args.record and seed is None:
+        # Uma gravação sempre tem semente, senão não poderia ser reproduzida
+        seed = random.getrandbits(63)
+    game = CyberNexus(bank_path=args.bank, puzzle=args.puzzle, graph_path=args.graph,
+                      prefetch_depth=args.prefetch, num_nodes=args.nodes,
+                      scaled=args.scaled, vsync=args.vsync,
+                      seed=seed)
+    recorder = None
+    if args.record:
+        recorder = SessionRecorder(args.record, SessionInfo(
+            seed, args.nodes, args.scaled or args.vsync))
+        print(f"Gravando a sessão em {args.record} (semente {seed})")
+    game.run(max_frames=args.max_frames, recorder=recorder)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Cyber Nexus - Pré-carregamento de puzzles em segundo plano
+Uma thread prepara os próximos grafos (gerados ou lidos do banco) com BFS
+e contagem de caminhos já calculados, para que "NOVO GRAFO" só precise
+tirar um da fila.
+"""
+
+import queue
+import threading
+from collections import namedtuple
+
+from graph_core import analyze_paths
+
+PREFETCH_DEPTH = 3
+# Fora da thread da interface podemos gastar mais tempo contando caminhos
+PREFETCH_PATH_BUDGET_MS = 50
+# Intervalo (s) em que a thread confere se foi cancelada
+PREFETCH_POLL_INTERVAL = 0.1
+
+# Grafo pronto para jogar + estatísticas de caminhos (PathStats)
+Puzzle = namedtuple("Puzzle", "graph stats")
+
+def prepare_puzzle(graph, budget_ms=PREFETCH_PATH_BUDGET_MS):
+    """Calcula BFS e contagem de caminhos do grafo"""
+    graph.bfs_info()
+    return Puzzle(graph, analyze_paths(graph, budget_ms))
+
+class PuzzlePrefetcher:
+    """Mantém até `depth` puzzles prontos, produzidos por `factory()` numa thread"""
+    def __init__(self, factory, depth=PREFETCH_DEPTH):
+        self.factory = factory
+        self.depth = max(1, depth)
+        self.queue = queue.Queue(maxsize=self.depth)
+        self.stop_event = threading.Event()
+        # Protege thread/carry/generation entre a interface e a thread
+        self.lock = threading.Lock()
+        # A própria thread zera a referência ao terminar; cancel() não espera
+        self.thread = None
+        self.error = None
+        # Puzzle pronto que não coube na fila antes de um cancelamento; é o
+        # próximo a ser entregue, então a ordem de factory() é preservada
+        self.carry = None
+        # Muda a cada descarte: um puzzle de antes dele não vira carry
+        self.generation = 0
+
+    @property
+    def running(self):
+        return self.thread is not None and not self.stop_event.is_set()
+
+    def start(self):
+        with self.lock:
+            self.stop_event.clear()
+            if self.thread is not None:
+                # Uma thread cancelada que ainda não saiu simplesmente continua
+                return
+            self.error = None
+            self.thread = threading.Thread(target=self._run, name="cyber-nexus-prefetch", daemon=True)
+            self.thread.start()
+
+    def _stopped(self, puzzle, generation):
+        """Sob o lock: se foi cancelada, guarda o puzzle pendente e encerra"""
+        if not self.stop_event.is_set():
+            return False
+        if puzzle is not None and generation == self.generation:
+            self.carry = puzzle
+        self.thread = None
+        return True
+
+    def _run(self):
+        try:
+            while True:
+                with self.lock:
+                    if self._stopped(None, self.generation):
+                        return
+                    puzzle, self.carry = self.carry, None
+                    generation = self.generation
+                if puzzle is None:
+                    puzzle = prepare_puzzle(self.factory())
+                while True:
+                    with self.lock:
+                        if self._stopped(puzzle, generation):
+                            return
+                    try:
+                        self.queue.put(puzzle, timeout=PREFETCH_POLL_INTERVAL)
+                        break
+                    except queue.Full:
+                        pass
+        except Exception as exc:
+            # Sem a thread, get() volta a preparar na hora; o erro reaparece lá
+            with self.lock:
+                self.error = exc
+                self.thread = None
+
+    def get(self):
+        """Próximo puzzle; só prepara na hora se a thread não estiver rodando"""
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        while self.running:
+            try:
+                return self.queue.get(timeout=PREFETCH_POLL_INTERVAL)
+            except queue.Empty:
+                pass
+        # Uma thread cancelada pode ainda estar em factory(): esperar por ela
+        # (o puzzle dela vira o carry) mantém a ordem e um só gerador por vez
+        self.join()
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            puzzle, self.carry = self.carry, None
+        if puzzle is not None:
+            return puzzle
+        return prepare_puzzle(self.factory())
+
+    def cancel(self, discard=False):
+        """Pede para a thread parar sem esperar por ela (e, se pedido, descarta
+        os puzzles já prontos). Um factory() em andamento termina em segundo
+        plano e o resultado vira o carry."""
+        with self.lock:
+            self.stop_event.set()
+            if discard:
+                self.generation += 1
+                self.carry = None
+                while True:
+                    try:
+                        self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+    def join(self, timeout=None):
+        """Espera a thread cancelada sair (ex.: antes de fechar o banco que ela lê)"""
+        thread = self.thread
+        if thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,254 @@
+"""
+Cyber Nexus - Formato binário de grafos e banco de puzzles
+Um grafo é salvo com coordenadas, arestas (na ordem de inserção), início,
+alvo e, opcionalmente, os custos das arestas (fase ponderada) e as camadas
+BFS (e, com custos, a árvore de caminhos mínimos) já calculadas. Um banco reúne
+milhares de grafos com um índice; é lido via mmap, então carregar o
+puzzle k é O(1) e não copia o arquivo.
+
+Layout (little-endian):
+    grafo:  GRAPH_HEADER | ids, xs, ys (int32 × n) | arestas (uint32 × 2m)
+            [| distância, distância ao alvo, pai (int32 × n) | caminhos (uint64 × n)]
+            [| custos (uint32 × m)]
+            [| custo mínimo (int32 × n, -1 = inalcançável), pai (int32 × n)]
+    Seções novas entram sempre depois das existentes, e flags desconhecidas
+    são rejeitadas.
+    banco:  BANK_HEADER | grafos... | índice (offset uint64, tamanho uint32) × k
+"""
+
+import math
+import mmap
+import random
+import struct
+from array import array
+
+from graph_core import BfsInfo, Graph, Node, ShortestPathTree
+
+GRAPH_MAGIC = b"CNXG"
+BANK_MAGIC = b"CNXB"
+FORMAT_VERSION = 1
+
+FLAG_BFS = 1
+FLAG_WEIGHTS = 2
+FLAG_SPT = 4
+KNOWN_FLAGS = FLAG_BFS | FLAG_WEIGHTS | FLAG_SPT
+
+# magic, versão, flags, nº nós, nº arestas, início, alvo
+GRAPH_HEADER = struct.Struct("<4sHHIIii")
+# magic, versão, nº grafos, offset do índice
+BANK_HEADER = struct.Struct("<4sHxxIQ")
+BANK_INDEX_ENTRY = struct.Struct("<QI")
+
+UINT64_MAX = (1 << 64) - 1
+
+class GraphFormatError(Exception):
+    pass
+
+def graph_to_bytes(graph, include_bfs=True):
+    """Serializa o grafo (e suas camadas BFS, se pedido) em bytes"""
+    nodes = graph.nodes
+    flags = FLAG_BFS if include_bfs else 0
+    if graph.weighted:
+        flags |= FLAG_WEIGHTS
+        if include_bfs:
+            flags |= FLAG_SPT
+    start = graph.start_node.index if graph.start_node is not None else -1
+    target = graph.target_node.index if graph.target_node is not None else -1
+
+    parts = [GRAPH_HEADER.pack(GRAPH_MAGIC, FORMAT_VERSION, flags,
+                               len(nodes), len(graph.edges), start, target)]
+    parts.append(array('i', [node.id for node in nodes]).tobytes())
+    parts.append(array('i', [int(node.x) for node in nodes]).tobytes())
+    parts.append(array('i', [int(node.y) for node in nodes]).tobytes())
+    endpoints = array('I')
+    for edge in graph.edges:
+        endpoints.append(edge.node1.index)
+        endpoints.append(edge.node2.index)
+    parts.append(endpoints.tobytes())
+
+    if include_bfs:
+        info = graph.bfs_info()
+        parts.append(info.distance.tobytes())
+        parts.append(info.to_target.tobytes())
+        parts.append(info.parent.tobytes())
+        parts.append(array('Q', [min(w, UINT64_MAX) for w in info.ways]).tobytes())
+    if graph.weighted:
+        parts.append(array('I', [edge.weight for edge in graph.edges]).tobytes())
+    if flags & FLAG_SPT:
+        tree = graph.shortest_path_tree()
+        parts.append(array('i', [-1 if d == math.inf else d for d in tree.distance]).tobytes())
+        parts.append(tree.parent.tobytes())
+    return b"".join(parts)
+
+def graph_from_bytes(buffer):
+    """Reconstrói um Graph a partir de bytes/memoryview (sem cópia do buffer)"""
+    view = memoryview(buffer)
+    if len(view) < GRAPH_HEADER.size:
+        raise GraphFormatError("registro de grafo truncado")
+    magic, version, flags, num_nodes, num_edges, start, target = \
+        GRAPH_HEADER.unpack_from(view, 0)
+    if magic != GRAPH_MAGIC:
+        raise GraphFormatError("não é um grafo do Cyber Nexus")
+    if version != FORMAT_VERSION:
+        raise GraphFormatError(f"versão de formato não suportada: {version}")
+    if flags & ~KNOWN_FLAGS:
+        raise GraphFormatError(f"seções desconhecidas no grafo (flags {flags:#x})")
+
+    if not -1 <= start < num_nodes or not -1 <= target < num_nodes:
+        raise GraphFormatError(f"início/alvo fora do grafo ({start}, {target}; {num_nodes} nós)")
+
+    offset = GRAPH_HEADER.size
+
+    def ints(code, count, size):
+        nonlocal offset
+        end = offset + count * size
+        if end > len(view):
+            raise GraphFormatError("registro de grafo truncado")
+        values = view[offset:end].cast(code)
+        offset = end
+        return values
+
+    ids = ints('i', num_nodes, 4)
+    xs = ints('i', num_nodes, 4)
+    ys = ints('i', num_nodes, 4)
+    endpoints = ints('I', 2 * num_edges, 4)
+    if num_edges and max(endpoints) >= num_nodes:
+        raise GraphFormatError(f"aresta com nó fora do grafo ({num_nodes} nós)")
+    bfs = None
+    if flags & FLAG_BFS:
+        bfs = (array('i', ints('i', num_nodes, 4)), array('i', ints('i', num_nodes, 4)),
+               array('i', ints('i', num_nodes, 4)), list(ints('Q', num_nodes, 8)))
+    weights = ints('I', num_edges, 4) if flags & FLAG_WEIGHTS else None
+    spt = None
+    if flags & FLAG_SPT:
+        spt = ([math.inf if d < 0 else d for d in ints('i', num_nodes, 4)],
+               array('i', ints('i', num_nodes, 4)))
+
+    # Pais das árvores pré-calculadas também indexam nós (-1 = sem pai)
+    for tree in (bfs[2] if bfs else None, spt[1] if spt else None):
+        if tree is not None and num_nodes and not -1 <= min(tree) <= max(tree) < num_nodes:
+            raise GraphFormatError(f"pai fora do grafo ({num_nodes} nós)")
+
+    graph = Graph()
+    for i in range(num_nodes):
+        graph.add_node(Node(ids[i], xs[i], ys[i], is_target=(i == target)))
+    nodes = graph.nodes
+    for k in range(num_edges):
+        graph.add_edge(nodes[endpoints[2 * k]], nodes[endpoints[2 * k + 1]],
+                       weights[k] if weights is not None else 1)
+    if weights is not None:
+        graph.weighted = True
+    if start >= 0:
+        graph.start_node = nodes[start]
+
+    if bfs is not None and start >= 0 and target >= 0:
+        distance, to_target, parent, ways = bfs
+        length = distance[target] if distance[target] >= 0 else None
+        graph.bfs_cache = BfsInfo(distance, to_target, parent, ways, length,
+                                  ways[target] if length is not None else 0)
+        graph.bfs_key = (len(graph.nodes), len(graph.edges), graph.start_node, graph.target_node)
+    if spt is not None and start >= 0 and target >= 0:
+        graph.spt_cache = ShortestPathTree(*spt)
+        graph.spt_key = (len(graph.nodes), len(graph.edges), graph.start_node, graph.weights_version)
+    del ids, xs, ys, endpoints, weights
+    return graph
+
+def save_graph(path, graph, include_bfs=True):
+    with open(path, "wb") as f:
+        f.write(graph_to_bytes(graph, include_bfs))
+
+def load_graph(path):
+    with open(path, "rb") as f:
+        return graph_from_bytes(f.read())
+
+class BankWriter:
+    """Escreve um banco de puzzles incrementalmente (índice gravado ao fechar)"""
+    def __init__(self, path, include_bfs=True):
+        self.file = open(path, "wb")
+        self.include_bfs = include_bfs
+        self.index = []
+        self.file.write(BANK_HEADER.pack(BANK_MAGIC, FORMAT_VERSION, 0, 0))
+
+    def add(self, graph):
+        return self.add_bytes(graph_to_bytes(graph, self.include_bfs))
+
+    def add_bytes(self, record):
+        """Acrescenta um grafo já serializado; retorna sua posição no banco"""
+        offset = self.file.tell()
+        self.file.write(record)
+        self.index.append((offset, len(record)))
+        return len(self.index) - 1
+
+    def close(self):
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        for offset, length in self.index:
+            self.file.write(BANK_INDEX_ENTRY.pack(offset, length))
+        self.file.seek(0)
+        self.file.write(BANK_HEADER.pack(BANK_MAGIC, FORMAT_VERSION, len(self.index), index_offset))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_bank(path, graphs, include_bfs=True):
+    with BankWriter(path, include_bfs) as writer:
+        for graph in graphs:
+            writer.add(graph)
+    return len(writer.index)
+
+class PuzzleBank:
+    """Banco de puzzles lido via mmap; load(k) é O(1)"""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, index_offset = BANK_HEADER.unpack_from(self.map, 0)
+        if magic != BANK_MAGIC:
+            self.close()
+            raise GraphFormatError("não é um banco de puzzles do Cyber Nexus")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise GraphFormatError(f"versão de formato não suportada: {version}")
+        self.count = count
+        self.index_offset = index_offset
+
+    def __len__(self):
+        return self.count
+
+    def record(self, k):
+        """Fatia (memoryview) do grafo k dentro do arquivo mapeado"""
+        if not 0 <= k < self.count:
+            raise IndexError(f"puzzle {k} fora do banco (0..{self.count - 1})")
+        offset, length = BANK_INDEX_ENTRY.unpack_from(
+            self.map, self.index_offset + k * BANK_INDEX_ENTRY.size)
+        return memoryview(self.map)[offset:offset + length]
+
+    def load(self, k):
+        record = self.record(k)
+        try:
+            return graph_from_bytes(record)
+        finally:
+            record.release()
+
+    def __getitem__(self, k):
+        return self.load(k)
+
+    def random(self, rng=random):
+        return self.load(rng.randrange(self.count))
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
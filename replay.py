@@ -0,0 +1,193 @@
+"""
+Cyber Nexus - Gravação e reprodução de sessões
+Grava a entrada (mouse, teclado) de cada iteração do loop junto com a
+semente da sessão, num log binário compacto (gzip). Com a mesma semente os
+grafos se repetem, então reproduzir o log num CyberNexus sem janela refaz
+a sessão: serve de carga repetível para medir frames, latência de clique e
+verificações, e mostra exatamente o que um aluno viu ao relatar um bug.
+
+Layout (little-endian, dentro do gzip):
+    LOG_HEADER | registros: tipo (uint8) + dados do tipo
+    Cada iteração começa com REC_FRAME (ms desde o início) seguido dos
+    eventos tratados nela.
+"""
+
+import gzip
+import struct
+import time
+from collections import namedtuple
+
+import pygame
+
+LOG_MAGIC = b"CNXR"
+LOG_VERSION = 2
+
+FLAG_SCALED = 1
+
+# magic, versão, flags, semente, nós dos grafos gerados
+LOG_HEADER = struct.Struct("<4sHHqI")
+
+REC_FRAME = 0
+REC_MOTION = 1
+REC_BUTTON_DOWN = 2
+REC_BUTTON_UP = 3
+REC_WHEEL = 4
+REC_KEY = 5
+REC_QUIT = 6
+REC_EXPOSE = 7
+
+RECORDS = {
+    REC_FRAME: struct.Struct("<I"),         # ms desde o início
+    REC_MOTION: struct.Struct("<hhhhB"),    # pos, rel, botões (bits)
+    REC_BUTTON_DOWN: struct.Struct("<hhB"), # pos, botão
+    REC_BUTTON_UP: struct.Struct("<hhB"),
+    REC_WHEEL: struct.Struct("<hhhh"),      # x, y, posição do mouse
+    REC_KEY: struct.Struct("<iH"),          # tecla, modificadores
+    REC_QUIT: struct.Struct("<"),
+    REC_EXPOSE: struct.Struct("<"),
+}
+
+# Configuração que muda o que a sessão gera ou como o mouse é lido
+SessionInfo = namedtuple("SessionInfo", "seed num_nodes scaled")
+
+class LogFormatError(Exception):
+    pass
+
+def encode_event(event):
+    """Registro do evento, ou None se ele não afeta o jogo"""
+    if event.type == pygame.MOUSEMOTION:
+        mask = sum(1 << i for i, pressed in enumerate(event.buttons[:8]) if pressed)
+        return bytes([REC_MOTION]) + RECORDS[REC_MOTION].pack(
+            event.pos[0], event.pos[1], int(event.rel[0]), int(event.rel[1]), mask)
+    if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        kind = REC_BUTTON_DOWN if event.type == pygame.MOUSEBUTTONDOWN else REC_BUTTON_UP
+        return bytes([kind]) + RECORDS[kind].pack(event.pos[0], event.pos[1], event.button)
+    if event.type == pygame.MOUSEWHEEL:
+        # O zoom usa a posição do mouse, que não vem no evento
+        x, y = getattr(event, "pos", None) or pygame.mouse.get_pos()
+        return bytes([REC_WHEEL]) + RECORDS[REC_WHEEL].pack(event.x, event.y, x, y)
+    if event.type == pygame.KEYDOWN:
+        return bytes([REC_KEY]) + RECORDS[REC_KEY].pack(event.key, event.mod & 0xFFFF)
+    if event.type == pygame.QUIT:
+        return bytes([REC_QUIT])
+    if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+        return bytes([REC_EXPOSE])
+    return None
+
+def decode_event(kind, values):
+    if kind == REC_MOTION:
+        x, y, dx, dy, mask = values
+        return pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y), rel=(dx, dy),
+                                  buttons=tuple(bool(mask >> i & 1) for i in range(3)))
+    if kind in (REC_BUTTON_DOWN, REC_BUTTON_UP):
+        x, y, button = values
+        event_type = pygame.MOUSEBUTTONDOWN if kind == REC_BUTTON_DOWN else pygame.MOUSEBUTTONUP
+        return pygame.event.Event(event_type, pos=(x, y), button=button)
+    if kind == REC_WHEEL:
+        dx, dy, x, y = values
+        return pygame.event.Event(pygame.MOUSEWHEEL, x=dx, y=dy, pos=(x, y))
+    if kind == REC_KEY:
+        key, mod = values
+        return pygame.event.Event(pygame.KEYDOWN, key=key, mod=mod)
+    if kind == REC_QUIT:
+        return pygame.event.Event(pygame.QUIT)
+    return pygame.event.Event(pygame.WINDOWEXPOSED)
+
+class SessionRecorder:
+    """Grava as iterações do loop (tempo + eventos) num log de sessão"""
+    def __init__(self, path, info):
+        self.path = path
+        self.file = gzip.open(path, "wb")
+        self.started = None
+        self.frames = 0
+        self.file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION,
+                                        FLAG_SCALED if info.scaled else 0,
+                                        info.seed, info.num_nodes))
+
+    def frame(self, now, events):
+        """Registra uma iteração: `now` (perf_counter) e os eventos tratados"""
+        if self.started is None:
+            self.started = now
+        ms = min(int((now - self.started) * 1000), 0xFFFFFFFF)
+        parts = [bytes([REC_FRAME]), RECORDS[REC_FRAME].pack(ms)]
+        for event in events:
+            record = encode_event(event)
+            if record is not None:
+                parts.append(record)
+        self.file.write(b"".join(parts))
+        self.frames += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_log(path):
+    """Lê um log; retorna (SessionInfo, [(segundos, [eventos]), ...])"""
+    with gzip.open(path, "rb") as f:
+        data = f.read()
+    if len(data) < LOG_HEADER.size:
+        raise LogFormatError("log de sessão truncado")
+    magic, version, flags, seed, num_nodes = LOG_HEADER.unpack_from(data, 0)
+    if magic != LOG_MAGIC:
+        raise LogFormatError("não é um log de sessão do Cyber Nexus")
+    if version != LOG_VERSION:
+        raise LogFormatError(f"versão de formato não suportada: {version}")
+    info = SessionInfo(seed, num_nodes, bool(flags & FLAG_SCALED))
+
+    frames = []
+    offset = LOG_HEADER.size
+    while offset < len(data):
+        kind = data[offset]
+        record = RECORDS.get(kind)
+        if record is None or offset + 1 + record.size > len(data):
+            raise LogFormatError(f"registro inválido na posição {offset}")
+        values = record.unpack_from(data, offset + 1)
+        offset += 1 + record.size
+        if kind == REC_FRAME:
+            frames.append((values[0] / 1000, []))
+        elif not frames:
+            raise LogFormatError("evento antes do primeiro frame")
+        else:
+            frames[-1][1].append(decode_event(kind, values))
+    return info, frames
+
+class ReplaySource:
+    """Entrega as iterações gravadas ao loop, o mais rápido possível ou no tempo original"""
+    def __init__(self, frames, realtime=False):
+        self.frames = frames
+        self.realtime = realtime
+        self.position = 0
+        self.started = None
+
+    def next_frame(self):
+        """(instante, eventos) da próxima iteração, ou None no fim do log"""
+        if self.position >= len(self.frames):
+            return None
+        at, events = self.frames[self.position]
+        self.position += 1
+        if self.started is None:
+            self.started = time.perf_counter() - at
+        now = self.started + at
+        if self.realtime:
+            delay = now - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return now, events
+
+def replay_report(profiler, frames, elapsed):
+    """Linhas de resumo de uma reprodução a partir do FrameProfiler"""
+    drawn = list(profiler.frames)
+    lines = [f"{frames} iterações, {len(drawn)} frames desenhados em {elapsed:.2f} s"]
+    for phase in ("total_ms", "events_ms", "draw_ms", "flip_ms"):
+        p50, p95, p99 = profiler.percentiles([frame[phase] for frame in drawn])
+        lines.append(f"{phase:10s} p50 {p50:7.3f}  p95 {p95:7.3f}  p99 {p99:7.3f} ms")
+    l50, l95, l99 = profiler.percentiles(profiler.latencies)
+    lines.append(f"latência de clique p50 {l50:.3f}  p95 {l95:.3f}  p99 {l99:.3f} ms "
+                 f"({len(profiler.latencies)} cliques)")
+    return lines
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Cyber Nexus - Servidor de sala de aula com várias sessões
+Um único processo asyncio mantém em memória as sessões de uma turma (30–60
+alunos), cada uma com seu grafo, caminho e progresso nas fases. Os clientes
+só enviam cliques. A geração de grafos roda num pool de processos e as
+verificações num pool de threads, então uma geração lenta não trava as
+outras sessões.
+
+Protocolo: uma mensagem JSON por linha, nos dois sentidos.
+    -> {"id": 1, "op": "join", "name": "Ana"}
+    <- {"id": 1, "ok": true, "session": "...", ...}
+Operações: join, start, new_graph, click, reset, verify, state, bye.
+
+Uso:
+    python server.py --port 8765 --workers 4
+    python client.py --port 8765 --students 30
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from graph_core import (PathValidator, VerifyStatus, analyze_paths, derive_seed,
+                        generate_random_graph, graph_bounds, path_cost)
+from prefetch import PREFETCH_PATH_BUDGET_MS
+from puzzle_bank import graph_from_bytes, graph_to_bytes
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_NODES = 12
+# Threads das verificações (O(caminho), mas fora do loop de eventos)
+VERIFY_THREADS = 4
+# Maior linha aceita de um cliente (bytes)
+MAX_REQUEST_BYTES = 64 * 1024
+
+# Fase -> (algoritmo, grafo com custos?)
+PHASES = {
+    1: ("BFS", False),
+    2: ("DFS", False),
+    3: ("Dijkstra", True),
+}
+
+class ProtocolError(Exception):
+    pass
+
+def prepare_session_puzzle(num_nodes, seed, weighted):
+    """Gera e prepara um grafo (roda num processo do pool); volta serializado.
+
+    O registro leva BFS e, com custos, a árvore de caminhos mínimos: o
+    servidor só desserializa, e verificar custa O(caminho).
+    """
+    graph = generate_random_graph(num_nodes, *graph_bounds(num_nodes),
+                                  weighted=weighted, seed=seed)
+    stats = analyze_paths(graph, PREFETCH_PATH_BUDGET_MS)
+    return graph_to_bytes(graph), stats
+
+def describe_graph(graph):
+    """Grafo em JSON para o cliente desenhar"""
+    return {
+        "nodes": [[node.id, node.x, node.y] for node in graph.nodes],
+        "edges": [[edge.node1.id, edge.node2.id, edge.weight] for edge in graph.edges],
+        "start": graph.start_node.id,
+        "target": graph.target_node.id,
+        "weighted": graph.weighted,
+    }
+
+def path_ids(path):
+    return [node.id for node in path] if path is not None else None
+
+class GameSession:
+    """Estado de um aluno: grafo, caminho e fases concluídas"""
+    def __init__(self, session_id, name, seed=None):
+        self.id = session_id
+        self.name = name
+        # Semente da sessão (None = aleatória) e grafos já sorteados por fase
+        self.seed = seed
+        self.seed_counters = {}
+        self.phase = None
+        self.graph = None
+        self.stats = None
+        self.nodes_by_id = {}
+        self.validator = None
+        self.completed = {phase: False for phase in PHASES}
+        # Próximo grafo de cada fase, já em preparação no pool
+        self.prefetched = {}
+
+    def next_seed(self, phase):
+        if self.seed is None:
+            return None
+        k = self.seed_counters.get(phase, 0)
+        self.seed_counters[phase] = k + 1
+        return derive_seed(self.seed, "fase", phase, k)
+
+    @property
+    def player_path(self):
+        return self.validator.path if self.validator is not None else []
+
+    def use_graph(self, phase, graph, stats):
+        self.phase = phase
+        self.graph = graph
+        self.stats = stats
+        self.nodes_by_id = {node.id: node for node in graph.nodes}
+        self.validator = PathValidator(graph)
+
+    def require_graph(self):
+        if self.graph is None:
+            raise ProtocolError("nenhuma fase iniciada (envie start)")
+
+    def reset(self):
+        self.require_graph()
+        self.validator = PathValidator(self.graph)
+
+    def click(self, node_id):
+        self.require_graph()
+        node = self.nodes_by_id.get(node_id) if isinstance(node_id, int) else None
+        if node is None:
+            raise ProtocolError(f"nó inexistente: {node_id}")
+        return self.validator.add(node)
+
+    def verify(self):
+        """Verifica o caminho conforme a fase (chamado numa thread do pool)"""
+        self.require_graph()
+        if self.phase == 1:
+            result = self.validator.check_bfs()
+        elif self.phase == 2:
+            result = self.validator.check_dfs()
+        else:
+            result = self.validator.check_weighted()
+        if result.status == VerifyStatus.SUCCESS:
+            self.completed[self.phase] = True
+        return result
+
+    def cost(self, path):
+        return path_cost(self.graph, path) if self.graph.weighted and path else None
+
+    def summary(self):
+        return {
+            "session": self.id,
+            "name": self.name,
+            "phase": self.phase,
+            "path": path_ids(self.player_path),
+            "completed": [phase for phase, done in self.completed.items() if done],
+        }
+
+    def cancel_prefetch(self):
+        for future in self.prefetched.values():
+            future.cancel()
+        self.prefetched.clear()
+
+class NexusServer:
+    """Sessões em memória atendidas por um loop asyncio"""
+    def __init__(self, num_nodes=DEFAULT_NODES, workers=None, seed=None):
+        self.num_nodes = num_nodes
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.sessions = {}
+        self.joined = 0
+        self.generation_pool = None
+        self.verify_pool = None
+
+    def open_pools(self):
+        if self.generation_pool is None:
+            self.generation_pool = ProcessPoolExecutor(self.workers)
+            self.verify_pool = ThreadPoolExecutor(VERIFY_THREADS)
+
+    def close(self):
+        for session in self.sessions.values():
+            session.cancel_prefetch()
+        if self.generation_pool is not None:
+            self.generation_pool.shutdown(cancel_futures=True)
+            self.verify_pool.shutdown()
+            self.generation_pool = self.verify_pool = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Abre os pools e começa a aceitar conexões; retorna o asyncio.Server"""
+        self.open_pools()
+        return await asyncio.start_server(self.handle_client, host, port,
+                                          limit=MAX_REQUEST_BYTES)
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await self.start(host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Servidor Cyber Nexus em {address[0]}:{address[1]} "
+              f"({self.workers} processos de geração)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    async def handle_client(self, reader, writer):
+        """Atende uma conexão: uma resposta por linha recebida, em ordem"""
+        session = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Linha acima de MAX_REQUEST_BYTES: o fluxo não é mais confiável
+                    await self.send(writer, {"ok": False, "error": "mensagem grande demais"})
+                    break
+                if not line:
+                    break
+                request = {}
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ProtocolError("a mensagem deve ser um objeto JSON")
+                    request = message
+                    op = request.get("op")
+                    if op == "join":
+                        session, reply = self.join(request, session)
+                    elif session is None:
+                        raise ProtocolError("envie join antes de outras operações")
+                    else:
+                        handler = getattr(self, f"op_{op}", None) if isinstance(op, str) else None
+                        if handler is None:
+                            raise ProtocolError(f"operação desconhecida: {op}")
+                        reply = await handler(session, request)
+                    response = {"ok": True, **reply}
+                except (ProtocolError, ValueError) as exc:
+                    response = {"ok": False, "error": str(exc)}
+                except Exception as exc:
+                    # Falha ao gerar/verificar: só esta requisição é perdida
+                    response = {"ok": False, "error": f"erro interno: {exc!r}"}
+                if "id" in request:
+                    response["id"] = request["id"]
+                await self.send(writer, response)
+                if request.get("op") == "bye" and response["ok"]:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def send(self, writer, message):
+        writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    def join(self, request, current):
+        """Cria uma sessão, ou retoma uma existente pelo identificador"""
+        session_id = request.get("session")
+        if session_id is not None:
+            session = self.sessions.get(session_id)
+            if session is None:
+                raise ProtocolError(f"sessão desconhecida: {session_id}")
+        elif current is not None:
+            session = current
+        else:
+            self.joined += 1
+            seed = derive_seed(self.seed, "sessão", self.joined) if self.seed is not None else None
+            session = GameSession(secrets.token_hex(8), str(request.get("name", "")), seed)
+            self.sessions[session.id] = session
+            print(f"{session.name or session.id} entrou ({len(self.sessions)} sessões)")
+        return session, session.summary()
+
+    def prepare(self, session, phase):
+        """Agenda a geração do próximo grafo da fase no pool de processos"""
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.generation_pool, prepare_session_puzzle,
+                                    self.num_nodes, session.next_seed(phase), PHASES[phase][1])
+
+    async def next_graph(self, session, phase):
+        future = session.prefetched.pop(phase, None) or self.prepare(session, phase)
+        record, stats = await future
+        # O seguinte já fica em preparação: "novo grafo" não espera a geração
+        session.prefetched[phase] = self.prepare(session, phase)
+        return graph_from_bytes(record), stats
+
+    async def op_start(self, session, request):
+        phase = request.get("phase")
+        if not isinstance(phase, int) or phase not in PHASES:
+            raise ProtocolError(f"fase inválida: {phase} (use {', '.join(map(str, PHASES))})")
+        graph, stats = await self.next_graph(session, phase)
+        session.use_graph(phase, graph, stats)
+        return {
+            "phase": phase,
+            "algorithm": PHASES[phase][0],
+            "graph": describe_graph(graph),
+            "simple_paths": stats.simple_paths,
+            "exact": stats.exact,
+        }
+
+    async def op_new_graph(self, session, request):
+        if session.phase is None:
+            raise ProtocolError("nenhuma fase iniciada (envie start)")
+        return await self.op_start(session, {"phase": session.phase})
+
+    async def op_click(self, session, request):
+        result = session.click(request.get("node"))
+        reply = {
+            "result": result.name,
+            "path": path_ids(session.player_path),
+            "dead_end": session.validator.dead_end,
+        }
+        if session.phase == 1:
+            reply["on_shortest"] = session.validator.on_shortest
+        if session.graph.weighted:
+            reply["cost"] = session.cost(session.player_path)
+        return reply
+
+    async def op_reset(self, session, request):
+        session.reset()
+        return {"path": []}
+
+    async def op_verify(self, session, request):
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.verify_pool, session.verify)
+        reply = {
+            "status": result.status.name,
+            "reference": path_ids(result.reference),
+            "completed": session.summary()["completed"],
+        }
+        if session.graph.weighted:
+            reply["cost"] = session.cost(session.player_path)
+            reply["reference_cost"] = session.cost(result.reference)
+        return reply
+
+    async def op_state(self, session, request):
+        return session.summary()
+
+    async def op_bye(self, session, request):
+        session.cancel_prefetch()
+        self.sessions.pop(session.id, None)
+        print(f"{session.name or session.id} saiu ({len(self.sessions)} sessões)")
+        return {}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de sala de aula do Cyber Nexus")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processos de geração (padrão: todos os núcleos)")
+    parser.add_argument("--nodes", type=int, default=DEFAULT_NODES)
+    parser.add_argument("--seed", type=int, default=None,
+                        help="semente da turma: sessões e grafos reproduzíveis")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = NexusServer(args.nodes, args.workers, args.seed)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("Servidor encerrado.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
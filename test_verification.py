@@ -0,0 +1,45 @@
+"""
+Verificação de caminhos (check_bfs_path, check_dfs_path, check_weighted_path):
+caminhos que não saem do nó inicial ou que repetem nós são inválidos.
+
+Uso:
+    python -m pytest test_verification.py
+"""
+
+from graph_core import (Graph, Node, VerifyStatus, check_bfs_path, check_dfs_path,
+                        check_weighted_path)
+
+def make_graph():
+    """Início 1, alvo 5; 1-2-3-5 é mínimo e 2-4-3 fecha um ciclo"""
+    graph = Graph()
+    nodes = {i: Node(i, i * 100, 0, is_target=(i == 5)) for i in range(1, 6)}
+    for node in nodes.values():
+        graph.add_node(node)
+    for a, b in ((1, 2), (2, 3), (3, 5), (2, 4), (4, 3)):
+        graph.add_edge(nodes[a], nodes[b])
+    graph.start_node = nodes[1]
+    return graph, nodes
+
+CHECKS = (check_bfs_path, check_dfs_path, check_weighted_path)
+
+def test_shortest_path_is_accepted():
+    graph, n = make_graph()
+    for check in CHECKS:
+        assert check(graph, [n[1], n[2], n[3], n[5]]).status == VerifyStatus.SUCCESS
+
+def test_path_must_start_at_start_node():
+    graph, n = make_graph()
+    for check in CHECKS:
+        assert check(graph, [n[2], n[3], n[5]]).status == VerifyStatus.INVALID
+
+def test_path_must_not_repeat_nodes():
+    graph, n = make_graph()
+    walk = [n[1], n[2], n[4], n[3], n[2], n[3], n[5]]
+    for check in CHECKS:
+        assert check(graph, walk).status == VerifyStatus.INVALID
+
+def test_longer_simple_path():
+    graph, n = make_graph()
+    path = [n[1], n[2], n[4], n[3], n[5]]
+    assert check_bfs_path(graph, path).status == VerifyStatus.SUBOPTIMAL
+    assert check_dfs_path(graph, path).status == VerifyStatus.SUCCESS